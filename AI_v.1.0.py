@@ -1,103 +1,8 @@
-import numpy as np
-import pandas as pd
+# Class-weighted Keras MLP validity classifier.
+# The pipeline lives in the validity_model package; this script is the same as
+#   python -m validity_model train --backend keras [--no-plots] ...
+import sys
 
-# Load dataset
-df = pd.read_csv("data.csv")
-df = df[df['valid'].notnull()]
+from validity_model.cli import main
 
-# Features and target
-X = df.drop(columns=["valid", "camera_target", "seed", "camera_dist"])
-y = df["valid"].astype(int)
-
-# Train/test split
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# Scale features
-scaler = StandardScaler()
-X_train = scaler.fit_transform(X_train)
-X_test = scaler.transform(X_test)
-
-# Handle class imbalance via class weights
-from sklearn.utils.class_weight import compute_class_weight
-
-class_weights = compute_class_weight(
-    class_weight='balanced',
-    classes=np.unique(y_train),
-    y=y_train
-)
-class_weight_dict = {0: class_weights[0], 1: class_weights[1]}
-print("Class weights:", class_weight_dict)
-
-# Build neural network
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
-from tensorflow.keras.optimizers import Adam
-
-model = Sequential([
-    Dense(64, activation='relu', input_shape=(X_train.shape[1],)),
-    Dropout(0.2),
-    Dense(32, activation='relu'),
-    Dropout(0.2),
-    Dense(1, activation='sigmoid')  # Output probability for binary classification
-])
-
-model.compile(
-    optimizer=Adam(learning_rate=0.001),
-    loss='binary_crossentropy',
-    metrics=['accuracy']
-)
-
-# Train
-history = model.fit(
-    X_train, y_train,
-    validation_split=0.2,
-    epochs=50,
-    batch_size=32,
-    class_weight=class_weight_dict,
-    verbose=2
-)
-
-# Evaluate
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
-
-y_pred_prob = model.predict(X_test).flatten()
-y_pred = (y_pred_prob > 0.5).astype(int)
-
-print("Classification Report:\n", classification_report(y_test, y_pred))
-print("Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
-print("ROC-AUC:", roc_auc_score(y_test, y_pred_prob))
-
-# Plot training curves and ROC-AUC
-import matplotlib.pyplot as plt
-from sklearn.metrics import roc_curve
-
-# Accuracy/Loss curves
-plt.figure(figsize=(12,4))
-plt.subplot(1,2,1)
-plt.plot(history.history['accuracy'], label='train_acc')
-plt.plot(history.history['val_accuracy'], label='val_acc')
-plt.title('Accuracy')
-plt.legend()
-
-plt.subplot(1,2,2)
-plt.plot(history.history['loss'], label='train_loss')
-plt.plot(history.history['val_loss'], label='val_loss')
-plt.title('Loss')
-plt.legend()
-plt.show()
-
-# ROC Curve
-fpr, tpr, thresholds = roc_curve(y_test, y_pred_prob)
-plt.figure()
-plt.plot(fpr, tpr, label=f"ROC-AUC = {roc_auc_score(y_test, y_pred_prob):.3f}")
-plt.plot([0,1],[0,1],'--', color='gray')
-plt.xlabel("False Positive Rate")
-plt.ylabel("True Positive Rate")
-plt.title("ROC Curve")
-plt.legend()
-plt.show()
+main(["train", "--backend", "keras"] + sys.argv[1:])
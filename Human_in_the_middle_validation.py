@@ -1,15 +1,94 @@
+import os
 import sys
+import time
 sys.path.append(r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar")
 from hexgrid_params import *
-from helper_functions import inspect_mod_inputs, inspect_node, generate_distinct_colors
+from helper_functions import inspect_mod_inputs, inspect_node, generate_distinct_colors, terrain_half_extent, camera_clip
+from prefetch import RenderPrefetcher
+from triage import load_classifier, triage, store_auto_labels
+from frustum_check import coverage_filter
+from seed_proposer import load_proposer, propose, provenance
+from label_writer import open_writer, release_writer
+import timing
 
 # === CONFIG ===
+# .csv appends one line per label, .db/.sqlite upserts into SQLite
+# (python param_store.py data.csv data.db migrates an existing CSV)
 CSV_PATH = r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar\data.csv"
 SEED_LIST = list(range(0, 201)) 
 
+# Triage: with TRIAGE_MODEL set to a validity_model artifact, the
+# seeds to review are picked from TRIAGE_POOL by TRIAGE_POLICY ("uncertainty",
+# "score" or "sequential") instead of SEED_LIST. Candidates scoring above
+# AUTO_ACCEPT_ABOVE / below AUTO_REJECT_BELOW are labelled without review
+# (label_source="model").
+TRIAGE_MODEL = None
+TRIAGE_POOL = range(0, 100_000)
+TRIAGE_POLICY = "uncertainty"
+TRIAGE_QUEUE_SIZE = 200
+AUTO_ACCEPT_ABOVE = None
+AUTO_REJECT_BELOW = None
+
+# Coverage check: seeds whose camera frame is less than MIN_COVERAGE terrain
+# (frustum_check, no render needed) are labelled invalid with
+# label_source="coverage" and skipped. None disables it. The terrain half
+# width is read off the evaluated grid unless GRID_HALF_EXTENT is set, and
+# terrain beyond the camera's clip_end counts as empty.
+MIN_COVERAGE = None
+GRID_HALF_EXTENT = None
+
+# Proposals: with PROPOSER set ("histogram" or "classifier", the latter uses
+# PROPOSER_MODEL), the seeds to review are drawn from PROPOSAL_POOL where
+# the labels so far say valid seeds are likely, aiming at TARGET_YIELD valid
+# with a PROPOSAL_EXPLORE share of uniform picks. Each label row records
+# proposer, proposal_p and review_time; python seed_proposer.py --data
+# <CSV_PATH> --report compares valid seeds per hour across proposers.
+PROPOSER = None
+PROPOSER_MODEL = None
+PROPOSAL_POOL = range(0, 1_000_000)
+PROPOSAL_COUNT = 200
+TARGET_YIELD = 0.5
+PROPOSAL_EXPLORE = 0.1
+
+# Prefetch: background Blender processes render the next PREFETCH_AHEAD seeds
+# as low-res stills, and each seed is shown from its still in an Image Editor
+# area instead of re-evaluating the scene. "Show 3D Scene" builds the full
+# scene for the current seed on demand. Needs the .blend to be saved.
+PREFETCH = False
+PREFETCH_AHEAD = 8
+PREFETCH_WORKERS = 2
+PREFETCH_RES_PERCENT = 25
+PREFETCH_WAIT = 5.0  # seconds to wait for a still before evaluating the scene
+PREFETCH_DIR = os.path.join(os.path.dirname(CSV_PATH), "prefetch")
+PREVIEW_IMAGE = "HexGridPreview"
+
+# Labels: Y/N queue the row and a background thread writes them to CSV_PATH
+# in batches of LABEL_BATCH_SIZE or after LABEL_FLUSH_SECONDS, whichever
+# comes first. Queued labels are journalled to CSV_PATH + ".journal" and
+# written on the next start if Blender goes down first.
+# Starting the loop waits up to LABEL_FLUSH_TIMEOUT seconds for pending
+# labels to be stored and warns if they are not.
+LABEL_BATCH_SIZE = 50
+LABEL_FLUSH_SECONDS = 2.0
+LABEL_FLUSH_TIMEOUT = 5.0
+
+# Timing: per-stage timers (set_params, modifier writes, colour ramp, camera,
+# view layer update, viewport redraw, label queueing, review) over the whole
+# loop. A summary is printed when the loop stops and written to
+# TIMING_PREFIX.json and TIMING_PREFIX.trace.json (chrome://tracing).
+TIMING = False
+TIMING_PREFIX = os.path.join(os.path.dirname(CSV_PATH), "timing")
+
 running = False
 current_seed_index = 0
 pending_review = False
+prefetcher = None
+prefetch_waited = 0.0
+seed_provenance = {}
+shown_at = None
+redraw_since = None
+draw_handler = None
+label_writer = None
 
 obj = bpy.data.objects["HexGridController"]
 mod = bpy.data.objects["HexGridController"].modifiers["HexGrid"]
@@ -26,32 +105,191 @@ node_group = bpy.data.node_groups['HexGridGroup']
 
 
 # === Loop logic ===
+def open_label_writer():
+    global label_writer
+    if label_writer is None:
+        label_writer = open_writer(CSV_PATH, batch_size=LABEL_BATCH_SIZE, flush_interval=LABEL_FLUSH_SECONDS)
+    return label_writer
+
+
+def start_label_writer():
+    # Also writes labels journalled by a session that crashed, before the
+    # queues below look at what is labelled -> False if that timed out
+    return open_label_writer().flush(timeout=LABEL_FLUSH_TIMEOUT)
+
+
+def stop_label_writer():
+    global label_writer
+    if label_writer is not None:
+        release_writer(label_writer)
+        label_writer = None
+
+
+def save_label(hg, valid):
+    with timing.stage("seed.save_label"):
+        # open_label_writer: the loop may have been stopped with a seed on screen
+        open_label_writer().put(hg.to_row(valid))
+
+
+def build_triage_queue():
+    global SEED_LIST
+    store = open_store(CSV_PATH)
+    labelled = store.seeds() if store.exists() else []
+    clf = load_classifier(TRIAGE_MODEL)
+    SEED_LIST, accepted, rejected = triage(
+        clf, TRIAGE_POOL, TRIAGE_POLICY, AUTO_ACCEPT_ABOVE, AUTO_REJECT_BELOW,
+        exclude=labelled, limit=TRIAGE_QUEUE_SIZE, min_coverage=MIN_COVERAGE, **coverage_options(),
+    )
+    store_auto_labels(store, accepted, rejected)
+
+
+def build_proposal_queue():
+    global SEED_LIST, seed_provenance
+    store = open_store(CSV_PATH)
+    labelled = store.seeds() if store.exists() else []
+    model = load_proposer(PROPOSER, CSV_PATH, PROPOSER_MODEL)
+    proposals = propose(model, PROPOSAL_POOL, PROPOSAL_COUNT, TARGET_YIELD, PROPOSAL_EXPLORE,
+                        exclude=labelled, min_coverage=MIN_COVERAGE, **coverage_options())
+    SEED_LIST = proposals["seed"].tolist()
+    seed_provenance = provenance(proposals)
+
+
+def review_provenance(hg):
+    # Provenance plus how long the seed was on screen
+    if shown_at is None:
+        return
+    review_time = time.perf_counter() - shown_at
+    timing.record("seed.review", review_time)
+    if PROPOSER is not None:
+        hg.provenance["review_time"] = review_time
+
+
+def on_viewport_draw():
+    # First redraw after a seed was shown
+    global redraw_since
+    if redraw_since is not None:
+        timing.record("seed.redraw", time.perf_counter() - redraw_since)
+        redraw_since = None
+
+
+def start_timing():
+    global draw_handler
+    timing.enable(TIMING)
+    timing.reset()
+    if TIMING and draw_handler is None:
+        draw_handler = bpy.types.SpaceView3D.draw_handler_add(on_viewport_draw, (), 'WINDOW', 'POST_PIXEL')
+
+
+def stop_timing():
+    global draw_handler
+    if draw_handler is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(draw_handler, 'WINDOW')
+        draw_handler = None
+    if TIMING:
+        timing.print_summary()
+        timing.export_json(TIMING_PREFIX + ".json")
+        timing.export_chrome_trace(TIMING_PREFIX + ".trace.json")
+
+
+def coverage_options():
+    # frustum_check settings matching this scene
+    if MIN_COVERAGE is None:
+        return {}
+    extent = GRID_HALF_EXTENT if GRID_HALF_EXTENT is not None else terrain_half_extent(obj)
+    return {"grid_half_extent": extent, "clip_end": camera_clip()[1]}
+
+
+def apply_coverage_check():
+    global SEED_LIST
+    store = open_store(CSV_PATH)
+    labelled = set(store.seeds()) if store.exists() else set()
+    SEED_LIST, rejected = coverage_filter(SEED_LIST, MIN_COVERAGE, **coverage_options())
+    store_auto_labels(store, rejected[~rejected["seed"].isin(labelled)])
+
+
+def show_full_scene(hg):
+    hg.update()#modifying
+    bpy.data.objects['Plane'].location[2] = hg.instance_scale
+
+    # Switch to camera view
+    for area in bpy.context.screen.areas:
+        if area.type == 'VIEW_3D':
+            area.spaces.active.region_3d.view_perspective = 'CAMERA'
+
+    bpy.context.view_layer.update()
+
+
+def show_cached_image(path):
+    image_areas = [a for a in bpy.context.screen.areas if a.type == 'IMAGE_EDITOR']
+    if not image_areas:
+        return False
+
+    img = bpy.data.images.get(PREVIEW_IMAGE)
+    if img is None:
+        img = bpy.data.images.load(path)
+        img.name = PREVIEW_IMAGE
+    else:
+        img.filepath = path
+        img.reload()
+    for area in image_areas:
+        area.spaces.active.image = img
+        area.tag_redraw()
+    return True
+
+
+def start_prefetcher():
+    global prefetcher
+    if not bpy.data.filepath:
+        print("Prefetch disabled: save the .blend file first.")
+        return
+    prefetcher = RenderPrefetcher(bpy.app.binary_path, bpy.data.filepath, PREFETCH_DIR,
+                                  PREFETCH_WORKERS, PREFETCH_RES_PERCENT)
+
+
+def stop_prefetcher():
+    global prefetcher
+    if prefetcher is not None:
+        prefetcher.close()
+        prefetcher = None
+
+
 def process_next_seed():
-    global current_seed_index, running, pending_review
+    global current_seed_index, running, pending_review, prefetch_waited, shown_at, redraw_since
     if not running or current_seed_index >= len(SEED_LIST):
         running = False
         pending_review = False
+        stop_prefetcher()
+        stop_label_writer()
+        stop_timing()
         print("Seed loop stopped.")
         return None
 
     seed = SEED_LIST[current_seed_index]
+
+    path = None
+    if prefetcher is not None:
+        prefetcher.request(SEED_LIST[current_seed_index:current_seed_index + 1 + PREFETCH_AHEAD])
+        path = prefetcher.get(seed)
+        if path is None and prefetch_waited < PREFETCH_WAIT and prefetcher.available():
+            prefetch_waited += 0.05
+            return 0.05  # poll again
+        timing.record("seed.prefetch_wait", prefetch_waited)
+        prefetch_waited = 0.0
+
     print(f"Generating seed {seed}...")
 
     
     hg = HexGridParams(mod, node_group, seed)
-    hg.set_params()
-    hg.update()#modifying
-    bpy.data.objects['Plane'].location[2] = hg.instance_scale
+    with timing.stage("seed.set_params"):
+        hg.set_params()
+    hg.provenance = dict(seed_provenance.get(seed, {}))
+    with timing.stage("seed.show"):
+        if path is None or not show_cached_image(path):
+            show_full_scene(hg)
 
     bpy.types.Scene.hexgrid_current_hg = hg
     pending_review = True
-
-    # Switch to camera view
-    for area in bpy.context.screen.areas:
-        if area.type == 'VIEW_3D':
-            area.spaces.active.region_3d.view_perspective = 'CAMERA'
-
-    bpy.context.view_layer.update()
+    shown_at = redraw_since = time.perf_counter()
 
     print("Waiting for user validation (Y/N)...")
     return None
@@ -65,7 +303,8 @@ class HEXGRID_OT_mark_valid(bpy.types.Operator):
     def execute(self, context):
         global current_seed_index, pending_review
         hg = bpy.types.Scene.hexgrid_current_hg
-        hg.save_params(CSV_PATH, valid=True)
+        review_provenance(hg)
+        save_label(hg, valid=True)
         pending_review = False
         current_seed_index += 1
         bpy.app.timers.register(process_next_seed, first_interval=0.01)
@@ -79,7 +318,8 @@ class HEXGRID_OT_mark_invalid(bpy.types.Operator):
     def execute(self, context):
         global current_seed_index, pending_review
         hg = bpy.types.Scene.hexgrid_current_hg
-        hg.save_params(CSV_PATH, valid=False)
+        review_provenance(hg)
+        save_label(hg, valid=False)
         pending_review = False
         current_seed_index += 1
         bpy.app.timers.register(process_next_seed, first_interval=0.01)
@@ -95,6 +335,18 @@ class HEXGRID_OT_start_loop(bpy.types.Operator):
         global running, current_seed_index
         running = True
         current_seed_index = 0
+        start_timing()
+        if not start_label_writer():
+            self.report({'WARNING'}, f"{label_writer.pending()} labels are not stored yet; they stay in "
+                                     f"{os.path.basename(label_writer.journal_path)} and are retried")
+        if TRIAGE_MODEL:
+            build_triage_queue()
+        elif PROPOSER:
+            build_proposal_queue()
+        elif MIN_COVERAGE is not None:
+            apply_coverage_check()
+        if PREFETCH and prefetcher is None:
+            start_prefetcher()
         bpy.app.timers.register(process_next_seed, first_interval=0.01)
         print("Seed loop started.")
         return {'FINISHED'}
@@ -105,12 +357,27 @@ class HEXGRID_OT_stop_loop(bpy.types.Operator):
     bl_label = "Stop Seed Loop"
 
     def execute(self, context):
-        global running
+        global running, pending_review
         running = False
+        pending_review = False
+        stop_prefetcher()
+        stop_label_writer()
+        stop_timing()
         print("Seed loop stopped by user.")
         return {'FINISHED'}
 
 
+class HEXGRID_OT_show_scene(bpy.types.Operator):
+    bl_idname = "hexgrid.show_scene"
+    bl_label = "Show 3D Scene"
+
+    def execute(self, context):
+        hg = getattr(bpy.types.Scene, "hexgrid_current_hg", None)
+        if hg is not None:
+            show_full_scene(hg)
+        return {'FINISHED'}
+
+
 # --- Keypress handler for Y/N ---
 class HEXGRID_OT_keypress_handler(bpy.types.Operator):
     bl_idname = "hexgrid.keypress_handler"
@@ -156,12 +423,14 @@ class HEXGRID_PT_panel(bpy.types.Panel):
         layout.operator("hexgrid.mark_valid", text="Valid (Button)")
         layout.operator("hexgrid.mark_invalid", text="Invalid (Button)")
         layout.operator("hexgrid.keypress_handler", text="Enable Keypress Validation")
+        layout.operator("hexgrid.show_scene", text="Show 3D Scene")
 
 
 # --- Registration ---
 classes = (
     HEXGRID_OT_start_loop,
     HEXGRID_OT_stop_loop,
+    HEXGRID_OT_show_scene,
     HEXGRID_OT_mark_valid,
     HEXGRID_OT_mark_invalid,
     HEXGRID_OT_keypress_handler,
@@ -174,6 +443,7 @@ def register():
     print("HexGrid Addon Registered.")
 
 def unregister():
+    stop_label_writer()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     print("HexGrid Addon Unregistered.")
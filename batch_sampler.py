@@ -0,0 +1,238 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from param_store import N_COLORS, PARAM_COLUMNS, to_records
+
+
+# set_params always looks at the origin
+CAMERA_TARGET = (0.0, 0.0, 0.0)
+CAMERA_DIST = 200
+
+
+def hsv_to_rgb(hsv):
+    # Vectorized colorsys.hsv_to_rgb over the last axis, same arithmetic so
+    # results match bit-for-bit
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    i = (h * 6.0).astype(np.int64)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    rgb = np.stack([r, g, b], axis=-1)
+    grey = s == 0.0
+    rgb[grey] = v[grey, None]
+    return rgb
+
+
+M32 = np.uint64(0xFFFFFFFF)
+U32 = 0xFFFFFFFF
+# numpy.random.SeedSequence constants
+INIT_A, MULT_A = 0x43b0d7e5, 0x931e8875
+INIT_B, MULT_B = 0x8b51f9dd, 0x58f38ded
+MIX_MULT_L, MIX_MULT_R = 0xca01f9dd, 0x4973f715
+POOL_SIZE = 4
+# PCG64 (XSL-RR 128/64) multiplier, high and low words
+PCG_MULT = (np.uint64(0x2360ED051FC65DA4), np.uint64(0x4385DF649FCCF645))
+
+
+def _hash_consts(n, init, mult):
+    # hash_const before each use: SeedSequence updates it the same way for every seed
+    consts, h = [], init
+    for _ in range(n):
+        consts.append(h)
+        h = (h * mult) & U32
+    return consts
+
+
+def _seed_sequence(seeds):
+    # SeedSequence(seed).generate_state(4, np.uint64) for each seed, as 4 columns
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    entropy = [(seeds & M32).astype(np.uint32), (seeds >> np.uint64(32)).astype(np.uint32)]
+    entropy += [np.zeros(len(seeds), dtype=np.uint32)] * (POOL_SIZE - 2)
+    consts = iter(_hash_consts(POOL_SIZE + POOL_SIZE * (POOL_SIZE - 1), INIT_A, MULT_A))
+
+    def hashmix(value):
+        h = next(consts)
+        value = value ^ np.uint32(h)
+        value = value * np.uint32((h * MULT_A) & U32)
+        return value ^ (value >> np.uint32(16))
+
+    def mix(x, y):
+        result = np.uint32(MIX_MULT_L) * x - np.uint32(MIX_MULT_R) * y
+        return result ^ (result >> np.uint32(16))
+
+    pool = [hashmix(word) for word in entropy]
+    for i_src in range(POOL_SIZE):
+        for i_dst in range(POOL_SIZE):
+            if i_src != i_dst:
+                pool[i_dst] = mix(pool[i_dst], hashmix(pool[i_src]))
+
+    words = []
+    for i, h in enumerate(_hash_consts(2 * POOL_SIZE, INIT_B, MULT_B)):
+        value = pool[i % POOL_SIZE] ^ np.uint32(h)
+        value = value * np.uint32((h * MULT_B) & U32)
+        words.append((value ^ (value >> np.uint32(16))).astype(np.uint64))
+    return [words[2 * k] | (words[2 * k + 1] << np.uint64(32)) for k in range(POOL_SIZE)]
+
+
+def _mul64(a, b):
+    # Full 128-bit product of uint64 arrays -> (high, low)
+    a0, a1, b0, b1 = a & M32, a >> np.uint64(32), b & M32, b >> np.uint64(32)
+    p00, p01, p10, p11 = a0 * b0, a0 * b1, a1 * b0, a1 * b1
+    mid = (p00 >> np.uint64(32)) + (p01 & M32) + (p10 & M32)
+    low = (p00 & M32) | (mid << np.uint64(32))
+    high = p11 + (p01 >> np.uint64(32)) + (p10 >> np.uint64(32)) + (mid >> np.uint64(32))
+    return high, low
+
+
+def _step(state, inc):
+    # PCG64 state * multiplier + increment, mod 2**128
+    (sh, sl), (ih, il) = state, inc
+    high, low = _mul64(sl, PCG_MULT[1])
+    high = high + sh * PCG_MULT[1] + sl * PCG_MULT[0]
+    low2 = low + il
+    high = high + ih + (low2 < low).astype(np.uint64)
+    return high, low2
+
+
+def _pcg64(seeds):
+    # State and increment of default_rng(seed).bit_generator for each seed
+    s_high, s_low, i_high, i_low = _seed_sequence(seeds)
+    inc = ((i_high << np.uint64(1)) | (i_low >> np.uint64(63)), (i_low << np.uint64(1)) | np.uint64(1))
+    # pcg_setseq_128_srandom_r: step from 0, add the seed, step again
+    low = inc[1] + s_low
+    state = (inc[0] + s_high + (low < s_low).astype(np.uint64), low)
+    return _step(state, inc), inc
+
+
+def _next_double(state, inc):
+    state = _step(state, inc)
+    high, low = state
+    rot = high >> np.uint64(58)
+    x = high ^ low
+    out = (x >> rot) | (x << ((np.uint64(64) - rot) & np.uint64(63)))
+    return state, (out >> np.uint64(11)).astype(np.float64) * (1.0 / 9007199254740992.0)
+
+
+def _draw(seeds, n_colors):
+    # Replay the default_rng(seed) stream of HexGridParams.set_params:
+    #   random(3*n_colors + 3): colours (h, s, v each) then offset
+    #   standard_normal():      scale
+    #   random(10):             detail ... camera_scale
+    # Seeding and the uniform draws run on whole arrays. standard_normal uses
+    # numpy's ziggurat tables, so it stays per seed on one reused Generator.
+    # ~7 us/seed on one core against ~23 us for default_rng(seed) plus three
+    # calls: 1M seeds take ~7 s, divided by the workers of sample_params.
+    n_head = 3 * n_colors + 3
+    state, inc = _pcg64(seeds)
+    head = np.empty((len(seeds), n_head))
+    for j in range(n_head):
+        state, head[:, j] = _next_double(state, inc)
+    after_head = state
+    # Tail assuming the normal took one draw, as it does ~99% of the time
+    state = _step(state, inc)
+    tail = np.empty((len(seeds), 10))
+    for j in range(10):
+        state, tail[:, j] = _next_double(state, inc)
+
+    bit_generator = np.random.PCG64()
+    rng = np.random.Generator(bit_generator)
+    pcg = bit_generator.state
+    normal = []
+    first = tail[:, 0].tolist()
+    states = zip(after_head[0].tolist(), after_head[1].tolist(), inc[0].tolist(), inc[1].tolist())
+    for k, (s_high, s_low, i_high, i_low) in enumerate(states):
+        pcg["state"] = {"state": (s_high << 64) | s_low, "inc": (i_high << 64) | i_low}
+        bit_generator.state = pcg
+        normal.append(rng.standard_normal())
+        u = rng.random()
+        if u != first[k]:
+            # The normal rejected its first draw, so the tail starts later
+            tail[k, 0] = u
+            tail[k, 1:] = rng.random(9)
+    return head, np.array(normal), tail
+
+
+def _uniform(low, high, u):
+    # Generator.uniform is low + (high - low) * next_double
+    return low + (high - low) * u
+
+
+def sample_params(seeds, n_colors=N_COLORS, workers=1, chunksize=50_000):
+    # Parameter sets for many seeds at once, identical to
+    # HexGridParams(seed).set_params() followed by save_params(valid=None).
+    seeds = np.asarray(seeds, dtype=np.int64)
+
+    if workers is None:
+        workers = os.cpu_count()
+    if workers > 1 and len(seeds) > chunksize:
+        chunks = [seeds[i:i + chunksize] for i in range(0, len(seeds), chunksize)]
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_draw, chunks, [n_colors] * len(chunks)))
+        head, normal, tail = (np.concatenate(p) for p in zip(*parts))
+    else:
+        head, normal, tail = _draw(seeds, n_colors)
+
+    colors = hsv_to_rgb(head[:, :3 * n_colors].reshape(-1, n_colors, 3))
+    offset = _uniform(-999999, 999999, head[:, 3 * n_colors:])
+
+    data = {
+        "seed": seeds,
+        "scale": 0 + .1 * normal,
+        "detail": _uniform(0, 15, tail[:, 0]),
+        "roughness": tail[:, 1],
+        "lacunarity": _uniform(0, 2, tail[:, 2]),
+        "distortion": _uniform(0, 4, tail[:, 3]),
+        "instance_scale": _uniform(6, 16, tail[:, 4]),
+        "light_altitude": _uniform(0.2, 1.0, tail[:, 5]),
+        "light_azimuth": _uniform(0, 2*np.pi, tail[:, 6]),
+        "camera_dist": np.full(len(seeds), CAMERA_DIST),
+        "camera_azimuth": _uniform(0, 2*np.pi, tail[:, 7]),
+        "camera_polar": _uniform(1/9*np.pi, np.pi/3, tail[:, 8]),
+        "camera_target_x": CAMERA_TARGET[0],
+        "camera_target_y": CAMERA_TARGET[1],
+        "camera_target_z": CAMERA_TARGET[2],
+        "camera_scale": _uniform(30, 150, tail[:, 9]),
+        "valid": None,
+    }
+    for i in range(n_colors):
+        data[f"color_{i}_r"] = colors[:, i, 0]
+        data[f"color_{i}_g"] = colors[:, i, 1]
+        data[f"color_{i}_b"] = colors[:, i, 2]
+    data["offset_x"] = offset[:, 0]
+    data["offset_y"] = offset[:, 1]
+    data["offset_z"] = offset[:, 2]
+
+    columns = PARAM_COLUMNS if n_colors == N_COLORS else list(data)
+    return pd.DataFrame(data, columns=columns)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Pre-generate parameter sets for a seed range")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help=".csv, .parquet or .npy output")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = sample_params(range(args.start, args.stop), workers=args.workers)
+    print(f"Sampled {len(df)} parameter sets in {time.perf_counter() - t0:.2f}s")
+    if args.out:
+        if args.out.endswith(".parquet"):
+            df.to_parquet(args.out, index=False)
+        elif args.out.endswith(".npy"):
+            np.save(args.out, to_records(df))
+        else:
+            df.to_csv(args.out, index=False)
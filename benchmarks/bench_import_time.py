@@ -0,0 +1,67 @@
+# Start-up cost of the training entry points: the old eager imports of
+# AI_v.0.0.py / AI_v.1.0.py against what the validity_model CLI imports for
+# each path. Every case runs in a fresh interpreter, best of --repeat.
+#
+#   python benchmarks/bench_import_time.py
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+EAGER_XGB = (
+    "import pandas, numpy, matplotlib.pyplot; "
+    "from sklearn.model_selection import train_test_split; "
+    "from sklearn.preprocessing import StandardScaler; "
+    "from sklearn.metrics import classification_report; "
+    "from xgboost import XGBClassifier; "
+    "from imblearn.over_sampling import SMOTE"
+)
+EAGER_KERAS = (
+    "import pandas, numpy, matplotlib.pyplot; "
+    "from sklearn.preprocessing import StandardScaler; "
+    "from tensorflow.keras.models import Sequential"
+)
+
+CASES = {
+    "old AI_v.0.0 imports": EAGER_XGB,
+    "old AI_v.1.0 imports": EAGER_KERAS,
+    "cli (parse only)": "import validity_model.cli",
+    "train xgboost --no-plots": "import validity_model.train as t; t.get_backend('xgboost')",
+    "train xgboost + plots": "import validity_model.train as t; t.get_backend('xgboost'); import validity_model.plots",
+    "predict (xgboost)": "import validity_model.predict, xgboost",
+}
+
+CHECK_NO_MPL = (
+    "import sys, validity_model.train as t; t.get_backend('xgboost'); "
+    "assert 'matplotlib' not in sys.modules, 'matplotlib imported without plots'"
+)
+
+
+def run(code):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return time.perf_counter() - t0, proc.returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'best (s)':>9}")
+    for name, code in CASES.items():
+        results = [run(code) for _ in range(args.repeat)]
+        if not all(ok for _, ok in results):
+            print(f"{name:<28} {'n/a':>9}  (missing dependency)")
+            continue
+        print(f"{name:<28} {min(t for t, _ in results):>9.2f}")
+
+    _, ok = run(CHECK_NO_MPL)
+    print("\n--no-plots path imports matplotlib:", "no" if ok else "YES")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Per-call latency of the row lookup behind HexGridParams.load_params,
+# old full-parse path vs the cached param_store path.
+#
+#   python benchmarks/bench_load_params.py --rows 10000 --calls 200
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from param_store import PARAM_COLUMNS, open_store
+
+
+def make_csv(path, n_rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((n_rows, len(PARAM_COLUMNS))), columns=PARAM_COLUMNS)
+    df["seed"] = np.arange(n_rows)
+    df["valid"] = rng.random(n_rows) < 0.3
+    df.to_csv(path, index=False)
+
+
+def old_lookup(path, seed):
+    df = pd.read_csv(path)
+    if seed not in df["seed"].values:
+        raise ValueError(f"Seed {seed} not found in CSV.")
+    return df.loc[df["seed"] == seed].iloc[0]
+
+
+def time_calls(fn, seeds):
+    times = []
+    for seed in seeds:
+        t0 = time.perf_counter()
+        fn(seed)
+        times.append(time.perf_counter() - t0)
+    return np.array(times)
+
+
+def report(name, times):
+    print(f"{name:>14}: median {np.median(times) * 1e6:10.1f} us   "
+          f"p95 {np.percentile(times, 95) * 1e6:10.1f} us   n={len(times)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.csv")
+        make_csv(path, args.rows)
+        seeds = np.random.default_rng(1).integers(0, args.rows, args.calls).tolist()
+
+        report("read_csv+mask", time_calls(lambda s: old_lookup(path, s), seeds[: max(1, args.calls // 10)]))
+
+        store = open_store(path)
+        t0 = time.perf_counter()
+        store.get(seeds[0])
+        print(f"{'first get':>14}: {(time.perf_counter() - t0) * 1e3:10.1f} ms (parse + index)")
+        report("cached get", time_calls(store.get, seeds))
+
+        # a label written in between must not force a re-parse
+        store.upsert({"seed": args.rows, "valid": True})
+        report("get after save", time_calls(store.get, seeds))
+
+
+if __name__ == "__main__":
+    main()
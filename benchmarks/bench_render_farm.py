@@ -0,0 +1,43 @@
+# Render farm scaling: seeds/hour against worker count on this machine.
+#
+#   python benchmarks/bench_render_farm.py --blend scene.blend --seeds 64 --workers 1 2 4 8
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from render_farm import RenderFarm
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blender", default="blender")
+    parser.add_argument("--blend", required=True)
+    parser.add_argument("--seeds", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument("--res-percent", type=int, default=25)
+    parser.add_argument("--json", default=None, help="write results here")
+    args = parser.parse_args()
+
+    results = []
+    for n in sorted(set(args.workers)):
+        with tempfile.TemporaryDirectory() as out:
+            farm = RenderFarm(args.blender, args.blend, out, workers=n, res_percent=args.res_percent)
+            stats = farm.run(range(args.seeds))
+        results.append({"workers": n, "seeds": args.seeds, "seconds": stats["seconds"],
+                        "seeds_per_hour": stats["seeds_per_hour"]})
+
+    base = results[0]["seeds_per_hour"] or 1.0
+    print(f"\n{'workers':>8} {'seconds':>10} {'seeds/hour':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['seconds']:>10.1f} {r['seeds_per_hour']:>12.0f} {r['seeds_per_hour'] / base:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Minimal bpy / mathutils stand-ins so hexgrid_params and helper_functions
+# import and run on plain CPython. Only what those modules touch is modelled:
+# the HexGrid modifier and node group, Sun, Camera, Camera_culler and Plane,
+# the scene render resolution and view_layer.update(). Nothing is evaluated,
+# so timings cover the Python side of each call only.
+#
+#   import fake_bpy
+#   fake_bpy.install()
+#   mod, node_group = fake_bpy.hexgrid()
+import math
+import sys
+import types
+from types import SimpleNamespace
+
+INPUT_NAMES = ["Rows", "Cols", "Seed", "Offset", "Scale", "Detail", "Roughness", "Lacunarity",
+               "Distortion", "Height", "Color 1", "Color 2", "Color 3"]
+
+
+class Vector(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return super().__new__(cls, (float(v) for v in values))
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    @property
+    def length(self):
+        return math.sqrt(sum(v * v for v in self))
+
+    def to_track_quat(self, track="-Z", up="Y"):
+        # Only the camera's '-Z' / 'Y' look-at is modelled
+        x, y, z = self
+        yaw = math.atan2(y, x) - math.pi / 2
+        if yaw <= -math.pi:
+            yaw += 2 * math.pi
+        return Quaternion(Euler((math.atan2(math.hypot(x, y), -z), 0.0, yaw)))
+
+
+class Euler(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0), order="XYZ"):
+        return super().__new__(cls, (float(v) for v in values))
+
+
+class Quaternion:
+    def __init__(self, euler):
+        self._euler = euler
+
+    def to_euler(self, order="XYZ"):
+        return self._euler
+
+
+class Modifier(dict):
+    show_viewport = True
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Object(SimpleNamespace):
+    def __init__(self, name, type="MESH", data=None):
+        super().__init__(name=name, type=type, data=data, location=Vector(), rotation_euler=Euler(),
+                         scale=[1.0, 1.0, 1.0], modifiers={})
+
+
+def _node_group():
+    items = [SimpleNamespace(item_type="SOCKET", in_out="INPUT", name=name, identifier=f"Socket_{i}")
+             for i, name in enumerate(INPUT_NAMES)]
+    ramp = SimpleNamespace(color_ramp=SimpleNamespace(elements=[SimpleNamespace(color=None) for _ in range(3)]))
+    group = SimpleNamespace(name="HexGridGroup", interface=SimpleNamespace(items_tree=items),
+                            nodes={"Color Ramp": ramp})
+    group.as_pointer = lambda: id(group)
+    return group
+
+
+def build_modules():
+    bpy = types.ModuleType("bpy")
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+    mathutils.Euler = Euler
+    mathutils.Quaternion = Quaternion
+
+    controller = Object("HexGridController")
+    controller.modifiers["HexGrid"] = Modifier()
+    sun = Object("Sun", "LIGHT", SimpleNamespace(type="SUN"))
+    camera = Object("Camera", "CAMERA", SimpleNamespace(type="ORTHO", ortho_scale=50.0))
+    objects = {o.name: o for o in (controller, sun, camera, Object("Camera_culler"), Object("Plane"))}
+
+    render = SimpleNamespace(resolution_x=1920, resolution_y=1080, resolution_percentage=100, filepath="")
+    scene = SimpleNamespace(render=render)
+    bpy.data = SimpleNamespace(objects=objects, node_groups={"HexGridGroup": _node_group()},
+                               scenes={"Scene": scene})
+    bpy.context = SimpleNamespace(scene=scene, view_layer=SimpleNamespace(update=lambda: None))
+    bpy.types = SimpleNamespace(Node=SimpleNamespace(bl_rna=SimpleNamespace(properties=[])))
+    return bpy, mathutils
+
+
+def install():
+    # Idempotent; leaves a real bpy alone
+    if "bpy" in sys.modules:
+        return sys.modules["bpy"]
+    bpy, mathutils = build_modules()
+    sys.modules["bpy"] = bpy
+    sys.modules["mathutils"] = mathutils
+    return bpy
+
+
+def hexgrid():
+    bpy = sys.modules["bpy"]
+    return bpy.data.objects["HexGridController"].modifiers["HexGrid"], bpy.data.node_groups["HexGridGroup"]
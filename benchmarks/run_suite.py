@@ -0,0 +1,280 @@
+# Benchmark suite for the parameter, persistence and ML hot paths on plain
+# CPython (bpy/mathutils replaced by benchmarks/fake_bpy.py).
+#
+#   python benchmarks/run_suite.py --out results.json
+#   python benchmarks/run_suite.py --baseline baseline.json --fail-on-regression
+#   python benchmarks/run_suite.py --sizes 1000 100000 1000000 --save-baseline baseline.json
+#
+# Each case reports the best of --repeat runs in seconds plus seconds per
+# item. With --baseline every case is compared against the stored result and
+# anything slower by more than --tolerance is reported as a regression.
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.append(ROOT)
+sys.path.append(HERE)
+
+import fake_bpy
+
+fake_bpy.install()
+
+from batch_sampler import sample_params
+from camera_math import camera_poses
+from helper_functions import camera_move_and_cull, generate_distinct_colors
+from hexgrid_params import HexGridParams, reset_applied_state
+from param_store import open_store
+
+CASES = {}
+
+
+def case(name):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def rows_for(df):
+    return df.astype(object).where(df.notnull(), None).to_dict("records")
+
+
+@case("set_params")
+def bench_set_params(ctx):
+    mod, node_group = fake_bpy.hexgrid()
+    n = 2000
+
+    def run():
+        for seed in range(n):
+            HexGridParams(mod, node_group, seed).set_params()
+    return {"n": n, "seconds": best_of(run, ctx.repeat)}
+
+
+@case("sample_params")
+def bench_sample_params(ctx):
+    n = 100_000
+    return {"n": n, "seconds": best_of(lambda: sample_params(range(n)), ctx.repeat)}
+
+
+@case("generate_distinct_colors")
+def bench_colors(ctx):
+    rng = np.random.default_rng(0)
+    n = 20_000
+
+    def run():
+        for _ in range(n):
+            generate_distinct_colors(rng, 3)
+    return {"n": n, "seconds": best_of(run, ctx.repeat)}
+
+
+@case("update")
+def bench_update(ctx):
+    # Full update() for new seeds, then camera-only changes
+    mod, node_group = fake_bpy.hexgrid()
+    n = 2000
+    params = []
+    for seed in range(n):
+        hg = HexGridParams(mod, node_group, seed)
+        hg.set_params()
+        params.append(hg)
+
+    def run():
+        reset_applied_state()
+        for hg in params:
+            hg.update()
+    full = best_of(run, ctx.repeat)
+
+    def camera_only(cull):
+        hg = params[0]
+        for i in range(n):
+            hg.camera_azimuth = i * 1e-3
+            hg.update(cull=cull)
+    # In Blender update.camera_only still re-evaluates the geometry nodes
+    # (the culler moves); update.camera_held_culler does not
+    return [
+        {"name": "update.full", "n": n, "seconds": full},
+        {"name": "update.camera_only", "n": n, "seconds": best_of(lambda: camera_only(True), ctx.repeat)},
+        {"name": "update.camera_held_culler", "n": n, "seconds": best_of(lambda: camera_only(False), ctx.repeat)},
+    ]
+
+
+@case("camera_move_and_cull")
+def bench_camera(ctx):
+    bpy = sys.modules["bpy"]
+    cam, cont = bpy.data.objects["Camera"], bpy.data.objects["Camera_culler"]
+    rng = np.random.default_rng(0)
+    n = 2000
+    phi = rng.uniform(0, 2 * np.pi, n)
+    theta = rng.uniform(np.pi / 9, np.pi / 3, n)
+
+    def run():
+        for i in range(n):
+            camera_move_and_cull(cam, cont, 200, phi[i], theta[i], (0, 0, 0), .2)
+
+    m = 1_000_000
+    phi_m = rng.uniform(0, 2 * np.pi, m)
+    theta_m = rng.uniform(np.pi / 9, np.pi / 3, m)
+    return [
+        {"name": "camera_move_and_cull", "n": n, "seconds": best_of(run, ctx.repeat)},
+        {"name": "camera_poses.batch", "n": m,
+         "seconds": best_of(lambda: camera_poses(200, phi_m, theta_m, 100.0), ctx.repeat)},
+    ]
+
+
+@case("store")
+def bench_store(ctx):
+    # save_params / load_params against stores of each size
+    mod, node_group = fake_bpy.hexgrid()
+    results = []
+    for size in ctx.sizes:
+        rows = rows_for(sample_params(range(size)))
+        for ext in (".csv", ".db"):
+            path = os.path.join(ctx.tmp, f"store_{size}{ext}")
+            t0 = time.perf_counter()
+            open_store(path).upsert_many(rows)
+            results.append({"name": f"store{ext}.bulk_write.{size}", "n": size, "seconds": time.perf_counter() - t0})
+
+            # A fresh process would parse the file on the first lookup
+            fresh = type(open_store(path))(path)
+            t0 = time.perf_counter()
+            fresh.get(0)
+            results.append({"name": f"store{ext}.first_load.{size}", "n": 1, "seconds": time.perf_counter() - t0})
+            fresh.close()
+
+            seeds = np.random.default_rng(1).integers(0, size, 200).tolist()
+            hg = HexGridParams(mod, node_group, 0)
+
+            def load():
+                for seed in seeds:
+                    hg.load_params(seed, path)
+            results.append({"name": f"store{ext}.load_params.{size}", "n": len(seeds),
+                            "seconds": best_of(load, ctx.repeat)})
+
+            new = HexGridParams(mod, node_group, size + 1)
+            new.set_params()
+
+            def save():
+                for i in range(50):
+                    new.save_params(path, valid=bool(i % 2))
+            results.append({"name": f"store{ext}.save_params.{size}", "n": 50, "seconds": best_of(save, ctx.repeat)})
+    return results
+
+
+@case("train")
+def bench_train(ctx):
+    # Feature building and the AI_v.0.0.py (xgboost) training path
+    from validity_model.features import load_data
+    from validity_model.train import train
+
+    n = ctx.train_rows
+    df = sample_params(range(n))
+    df["valid"] = (df["detail"] > 7) & (df["camera_scale"] < 120)
+    path = os.path.join(ctx.tmp, "train.csv")
+    open_store(path).upsert_many(rows_for(df))
+
+    t0 = time.perf_counter()
+    load_data(path, cache=False)
+    build = time.perf_counter() - t0
+    load_data(path)
+    t0 = time.perf_counter()
+    load_data(path)
+    cached = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        train(path, "xgboost", os.path.join(ctx.tmp, "model.pkl"), plots=False)
+    return [
+        {"name": "features.build", "n": n, "seconds": build},
+        {"name": "features.cached", "n": n, "seconds": cached},
+        {"name": "train.xgboost", "n": n, "seconds": time.perf_counter() - t0},
+    ]
+
+
+def metadata():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True).stdout.strip()
+    except OSError:
+        rev = None
+    return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "cpus": os.cpu_count(), "git": rev, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline, tolerance):
+    # -> names of cases slower than baseline * (1 + tolerance)
+    regressions = []
+    print(f"\n{'case':<36} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        ratio = r["seconds"] / max(baseline[name]["seconds"], 1e-12)
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {baseline[name]['seconds']:>10.4f} {r['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000],
+                        help="store sizes in rows (add 1000000 for the full scaling run)")
+    parser.add_argument("--train-rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", default=None, help="also write results here as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        args.tmp = tmp
+        for name in args.cases:
+            out = CASES[name](args)
+            for r in out if isinstance(out, list) else [dict(out, name=name)]:
+                r["per_item"] = r["seconds"] / max(r["n"], 1)
+                results[r.pop("name")] = r
+                print(f"{list(results)[-1]:<36} {r['seconds']:>10.4f}s  {r['per_item'] * 1e6:>12.2f} us/item")
+
+    report = {"meta": metadata(), "results": results}
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
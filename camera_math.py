@@ -0,0 +1,141 @@
+# Camera placement for helper_functions.camera_move_and_cull in plain NumPy,
+# for whole arrays of poses at once and without Blender.
+#
+# look_at_euler gives the same rotation as mathutils'
+# direction.to_track_quat('-Z', 'Y').to_euler(): -Z points along the
+# direction, local Y points up (towards world +Z) and local X stays
+# horizontal. It is built the same way (rotate +Z onto the track axis, twist
+# about it, quaternion -> matrix -> XYZ Euler with the two-solution pick of
+# mat3_normalized_to_eul), so the angles match what Blender sets.
+import numpy as np
+
+# resolution_x, resolution_y of the HexGrid scene, for callers without bpy
+DEFAULT_RESOLUTION = (1920, 1080)
+
+
+def spherical_to_cartesian(r, phi, theta):
+    r, phi, theta = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (r, phi, theta)))
+    return np.stack([
+        r * np.sin(theta) * np.cos(phi),
+        r * np.sin(theta) * np.sin(phi),
+        r * np.cos(theta),
+    ], axis=-1)
+
+
+def _qmul(a, b):
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by + ay * bw + az * bx - ax * bz,
+        aw * bz + az * bw + ax * by - ay * bx,
+    ], axis=-1)
+
+
+def track_quat(direction):
+    # vec_to_quat(direction, axis='-Z', up='Y') -> (w, x, y, z)
+    vec = np.asarray(direction, dtype=np.float64)
+    length = np.linalg.norm(vec, axis=-1)
+    tvec = -vec  # negative track axis
+
+    # Rotate +Z onto tvec
+    nor = np.stack([-tvec[..., 1], tvec[..., 0], np.zeros_like(length)], axis=-1)
+    flat = np.abs(tvec[..., 0]) + np.abs(tvec[..., 1]) > 1e-4
+    nor_len = np.where(flat, np.linalg.norm(nor, axis=-1), 1.0)
+    nor = np.where(flat[..., None], nor / nor_len[..., None], [1.0, 0.0, 0.0])
+    safe_len = np.where(length == 0, 1.0, length)
+    angle = np.arccos(np.clip(tvec[..., 2] / safe_len, -1.0, 1.0))
+    q = np.concatenate([np.cos(0.5 * angle)[..., None], nor * np.sin(0.5 * angle)[..., None]], axis=-1)
+
+    # Twist about tvec so local Y points up
+    fp = quat_to_matrix(q)[..., :, 2]
+    half = 0.5 * np.arctan2(fp[..., 0], -fp[..., 1])
+    si = np.sin(half) / safe_len
+    q2 = np.concatenate([np.cos(half)[..., None], tvec * si[..., None]], axis=-1)
+    q = _qmul(q2, q)
+    return np.where((length == 0)[..., None], [1.0, 0.0, 0.0, 0.0], q)
+
+
+def quat_to_matrix(q):
+    # Rotation matrices, R[..., row, col], from (w, x, y, z) quaternions
+    q0, q1, q2, q3 = np.moveaxis(np.sqrt(2.0) * np.asarray(q, dtype=np.float64), -1, 0)
+    qda, qdb, qdc = q0 * q1, q0 * q2, q0 * q3
+    qaa, qab, qac = q1 * q1, q1 * q2, q1 * q3
+    qbb, qbc, qcc = q2 * q2, q2 * q3, q3 * q3
+    return np.stack([
+        np.stack([1.0 - qbb - qcc, -qdc + qab, qdb + qac], axis=-1),
+        np.stack([qdc + qab, 1.0 - qaa - qcc, -qda + qbc], axis=-1),
+        np.stack([-qdb + qac, qda + qbc, 1.0 - qaa - qbb], axis=-1),
+    ], axis=-2)
+
+
+def matrix_to_euler(R):
+    # XYZ Euler angles; of the two equivalent solutions the one with the
+    # smaller sum of absolute angles, like mathutils
+    R = np.asarray(R, dtype=np.float64)
+    cy = np.hypot(R[..., 0, 0], R[..., 1, 0])
+    eul1 = np.stack([
+        np.arctan2(R[..., 2, 1], R[..., 2, 2]),
+        np.arctan2(-R[..., 2, 0], cy),
+        np.arctan2(R[..., 1, 0], R[..., 0, 0]),
+    ], axis=-1)
+    eul2 = np.stack([
+        np.arctan2(-R[..., 2, 1], -R[..., 2, 2]),
+        np.arctan2(-R[..., 2, 0], -cy),
+        np.arctan2(-R[..., 1, 0], -R[..., 0, 0]),
+    ], axis=-1)
+    gimbal = np.stack([
+        np.arctan2(-R[..., 1, 2], R[..., 1, 1]),
+        np.arctan2(-R[..., 2, 0], cy),
+        np.zeros_like(cy),
+    ], axis=-1)
+    regular = cy > 16.0 * np.finfo(np.float32).eps
+    eul1 = np.where(regular[..., None], eul1, gimbal)
+    eul2 = np.where(regular[..., None], eul2, gimbal)
+    pick2 = np.abs(eul1).sum(axis=-1) > np.abs(eul2).sum(axis=-1)
+    return np.where(pick2[..., None], eul2, eul1)
+
+
+def look_at_euler(location, target):
+    direction = np.asarray(target, dtype=np.float64) - np.asarray(location, dtype=np.float64)
+    return matrix_to_euler(quat_to_matrix(track_quat(direction)))
+
+
+def culler_scale(ortho_scale, margin, resolution=DEFAULT_RESOLUTION):
+    # Box scale of Camera_culler so it covers the orthographic frame plus margin
+    resx, resy = resolution
+    ortho_scale, margin = np.broadcast_arrays(np.asarray(ortho_scale, dtype=np.float64),
+                                              np.asarray(margin, dtype=np.float64))
+    if resx >= resy:
+        aspect = resx / resy
+        sx, sy = aspect, 1.0
+    else:
+        aspect = resy / resx
+        sx, sy = 1.0, aspect
+    base = ortho_scale / aspect ** 2
+    return np.stack([base * (margin + 1) * sx, base * (margin + 1) * sy, base * 1000], axis=-1)
+
+
+def camera_poses(r, phi, theta, ortho_scale, target=(0.0, 0.0, 0.0), margin=0.2,
+                 resolution=DEFAULT_RESOLUTION):
+    # Camera location, rotation_euler and culler scale for arrays of poses.
+    # The camera sits at target + (r, phi, theta) and looks at target; the
+    # culler shares the camera rotation.
+    location = np.asarray(target, dtype=np.float64) + spherical_to_cartesian(r, phi, theta)
+    rotation = look_at_euler(location, target)
+    scale = culler_scale(ortho_scale, margin, resolution)
+    shape = np.broadcast_shapes(location.shape, scale.shape)
+    return tuple(np.broadcast_to(a, shape) for a in (location, rotation, scale))
+
+
+def frame_poses(df, margin=0.2, resolution=DEFAULT_RESOLUTION):
+    # camera_poses for a parameter table (param_store / batch_sampler rows)
+    target = df[["camera_target_x", "camera_target_y", "camera_target_z"]].to_numpy(dtype=np.float64)
+    return camera_poses(
+        df["camera_dist"].to_numpy(dtype=np.float64),
+        df["camera_azimuth"].to_numpy(dtype=np.float64),
+        df["camera_polar"].to_numpy(dtype=np.float64),
+        df["camera_scale"].to_numpy(dtype=np.float64),
+        target, margin, resolution,
+    )
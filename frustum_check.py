@@ -0,0 +1,119 @@
+# Pre-render check of how much of the orthographic frame the terrain fills,
+# from the sampled parameters alone (no Blender).
+#
+#   python frustum_check.py --start 0 --stop 100000 --min-coverage 0.6 \
+#       --grid-half-extent 64 55 --clip-end 1000 --store data.csv
+#
+# The terrain is treated as a box: grid_half_extent around the origin in X/Y
+# and 0 .. instance_scale in Z. The extent depends on the Rows/Cols and hex
+# size set in the .blend, so there is no default; inside Blender
+# helper_functions.terrain_half_extent() measures it on the evaluated grid.
+# For each seed a grid of rays, one per frame sample, is cast along the
+# camera direction (camera_math gives the pose) and coverage is the fraction
+# that hits the box. Seeds whose camera mostly frames empty space come out
+# near 0 and can be rejected before any render.
+# With clip_end set, hits beyond the camera's clip range do not count, so
+# poses whose terrain gets clipped away score low as well.
+import numpy as np
+
+from batch_sampler import sample_params
+from camera_math import DEFAULT_RESOLUTION, quat_to_matrix, spherical_to_cartesian, track_quat
+
+MIN_COVERAGE = 0.5
+SAMPLES = 16  # rays per frame side
+
+# Rows rejected here carry this in label_source
+COVERAGE_LABEL = "coverage"
+
+
+def frame_coverage(df, grid_half_extent, resolution=DEFAULT_RESOLUTION,
+                   samples=SAMPLES, clip_start=0.0, clip_end=None, chunksize=20_000):
+    # Fraction of frame samples that see the terrain box, one value per row.
+    # grid_half_extent is one half width or an (x, y) pair
+    coverage = np.empty(len(df))
+    for start in range(0, len(df), chunksize):
+        part = df.iloc[start:start + chunksize]
+        coverage[start:start + chunksize] = _coverage(part, grid_half_extent, resolution, samples,
+                                                      clip_start, np.inf if clip_end is None else clip_end)
+    return coverage
+
+
+def _coverage(df, grid_half_extent, resolution, samples, clip_start, clip_end):
+    target = df[["camera_target_x", "camera_target_y", "camera_target_z"]].to_numpy(dtype=np.float64)
+    offset = spherical_to_cartesian(df["camera_dist"].to_numpy(dtype=np.float64),
+                                    df["camera_azimuth"].to_numpy(dtype=np.float64),
+                                    df["camera_polar"].to_numpy(dtype=np.float64))
+    location = target + offset
+    R = quat_to_matrix(track_quat(-offset))
+    right, up, forward = R[:, :, 0], R[:, :, 1], -R[:, :, 2]
+
+    # Orthographic frame: ortho_scale spans the longer image side
+    resx, resy = resolution
+    scale = df["camera_scale"].to_numpy(dtype=np.float64)
+    width = scale * (1.0 if resx >= resy else resx / resy)
+    height = scale * (resy / resx if resx >= resy else 1.0)
+    u = (np.arange(samples) + 0.5) / samples - 0.5
+    uu, vv = np.meshgrid(u, u, indexing="ij")
+    origins = (location[:, None, :]
+               + (uu.ravel()[None, :, None] * width[:, None, None]) * right[:, None, :]
+               + (vv.ravel()[None, :, None] * height[:, None, None]) * up[:, None, :])
+
+    # Ray/box slab test against [-e, e] x [-e, e] x [0, instance_scale]
+    top = df["instance_scale"].to_numpy(dtype=np.float64)
+    ex, ey = np.broadcast_to(np.asarray(grid_half_extent, dtype=np.float64), 2)
+    low = np.stack([np.full(len(df), -ex), np.full(len(df), -ey), np.zeros(len(df))], -1)
+    high = np.stack([np.full(len(df), ex), np.full(len(df), ey), top], -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / forward[:, None, :]
+        t1 = (low[:, None, :] - origins) * inv
+        t2 = (high[:, None, :] - origins) * inv
+    # Axis-parallel rays: inside the slab on that axis or never
+    inside = (origins >= low[:, None, :]) & (origins <= high[:, None, :])
+    parallel = np.broadcast_to(forward[:, None, :] == 0, origins.shape)
+    t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2)).max(axis=-1)
+    t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2)).min(axis=-1)
+    hit = (t_near <= t_far) & (t_far >= clip_start) & (t_near <= clip_end)
+    return hit.mean(axis=1)
+
+
+def coverage_filter(seeds, min_coverage=MIN_COVERAGE, grid_half_extent=None, params=None, **kwargs):
+    # -> (seeds that pass, rejected rows labelled valid=False / label_source="coverage");
+    # kwargs (clip_end, resolution, ...) go to frame_coverage
+    df = sample_params(seeds) if params is None else params
+    if "coverage" not in df.columns:
+        if grid_half_extent is None:
+            raise ValueError("The coverage check needs grid_half_extent (see terrain_half_extent)")
+        df = df.assign(coverage=frame_coverage(df, grid_half_extent, **kwargs))
+    low = df["coverage"].to_numpy() < min_coverage
+    rejected = df[low].assign(valid=False, label_source=COVERAGE_LABEL)
+    print(f"Coverage check: {int(low.sum())} of {len(df)} seeds below {min_coverage:.2f}")
+    return df.loc[~low, "seed"].tolist(), rejected
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from param_store import open_store
+    from triage import store_auto_labels
+
+    parser = argparse.ArgumentParser(description="Estimate terrain coverage of the camera frame per seed")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=10_000)
+    parser.add_argument("--min-coverage", type=float, default=MIN_COVERAGE)
+    parser.add_argument("--grid-half-extent", type=float, nargs="+", required=True, metavar="HALF",
+                        help="terrain half width in X (and Y) in world units")
+    parser.add_argument("--clip-end", type=float, default=None, help="camera clip end")
+    parser.add_argument("--store", default=None, help="write rejected seeds as labels to this parameter store")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df = sample_params(range(args.start, args.stop))
+    df["coverage"] = frame_coverage(df, args.grid_half_extent, clip_end=args.clip_end)
+    print(f"Coverage of {len(df)} seeds in {time.perf_counter() - t0:.2f}s")
+    print(df["coverage"].describe(percentiles=[0.05, 0.25, 0.5, 0.75]).to_string())
+    _, rejected = coverage_filter(df["seed"], args.min_coverage, params=df)
+    if args.store:
+        store = open_store(args.store)
+        labelled = set(store.seeds()) if store.exists() else set()
+        store_auto_labels(store, rejected[~rejected["seed"].isin(labelled)])
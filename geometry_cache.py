@@ -0,0 +1,368 @@
+# On-disk cache of evaluated hex-grid terrain, so revisiting a seed does not
+# re-run the geometry nodes.
+#
+#   cache = GeometryCache(CACHE_DIR, max_bytes=1024 * 2**20)
+#   hg.load_params(seed, path)
+#   show_terrain(hg, cache)   # instead of hg.update()
+#
+# Entries are keyed by a hash of everything that changes the evaluated
+# geometry (the modifier's terrain inputs and the ramp colours, see
+# HexGridParams.applied_state), plus the camera pose and render resolution:
+# Camera_culler follows the camera, so the evaluated grid is cut to the
+# view. The light is not part of the key.
+# An entry holds the vertex heights and the mesh attributes (colours, UVs,
+# material index, ...) of the evaluated mesh as compressed .npz. The x/y
+# positions and the faces only depend on the grid and the culled view, so
+# they are stored once per topology and shared by the entries that use it.
+# A hit is shown on a plain mesh object (HexGridCache) while the HexGrid
+# modifier is switched off in the viewport; a miss evaluates the modifier as
+# usual and stores the result.
+#
+# prefetch(keys) loads entries in a background thread, so stepping to a
+# neighbouring seed that is already cached does not wait on the disk either.
+#
+# Least recently used files, entries and topologies alike, are deleted once
+# the directory grows past max_bytes; an entry whose topology was deleted is
+# a miss. The key does not cover the node group itself: clear() the cache
+# after editing the node tree.
+#
+# Only the mesh part of the evaluated geometry is captured (what
+# Object.to_mesh() returns); a node tree that ends in un-realized instances
+# is not cached.
+import hashlib
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import bpy
+import numpy as np
+
+import timing
+
+CACHE_OBJECT = "HexGridCache"
+TOPOLOGY_DIR = "topology"
+
+# Attribute data type -> (foreach property, dtype, width)
+ATTRIBUTE_TYPES = {
+    "FLOAT": ("value", np.float32, 1),
+    "INT": ("value", np.int32, 1),
+    "BOOLEAN": ("value", bool, 1),
+    "FLOAT2": ("vector", np.float32, 2),
+    "FLOAT_VECTOR": ("vector", np.float32, 3),
+    "FLOAT_COLOR": ("color", np.float32, 4),
+    "BYTE_COLOR": ("color", np.float32, 4),
+}
+# Edges are rebuilt on restore, so edge attributes would not line up
+DOMAINS = ("POINT", "FACE", "CORNER")
+
+
+def terrain_key(hg):
+    state = hg.applied_state()
+    render = bpy.context.scene.render
+    blob = json.dumps([hg.node_group.name, sorted(state["terrain"].items()), state["ramp"], state["culler"],
+                       (render.resolution_x, render.resolution_y)])
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class GeometryCache:
+    def __init__(self, directory, max_bytes=1024 * 2**20, memory_items=16):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        os.makedirs(os.path.join(directory, TOPOLOGY_DIR), exist_ok=True)
+
+        # key -> size in bytes, least recently used first (file mtimes carry
+        # the order across sessions). Topologies are in here too, under
+        # "topology/<id>", so they count towards max_bytes and age out.
+        entries = []
+        for prefix in ("", TOPOLOGY_DIR + "/"):
+            for name in os.listdir(os.path.join(directory, prefix)):
+                if name.endswith(".npz"):
+                    st = os.stat(os.path.join(directory, prefix, name))
+                    entries.append((st.st_mtime, prefix + name[:-4], st.st_size))
+        self.entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.memory = OrderedDict()  # key -> loaded entry, most recent last
+        self.topologies = {}
+        self.lock = threading.Lock()
+        self.todo = queue.Queue()
+        self.thread = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _topology_key(self, topology):
+        return f"{TOPOLOGY_DIR}/{topology}"
+
+    def _topology_path(self, topology):
+        return self._path(self._topology_key(topology))
+
+    def size(self):
+        with self.lock:
+            return sum(self.entries.values())
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def _load(self, key):
+        # Entry and its topology into memory -> entry, or None
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+            if key not in self.entries:
+                return None
+        try:
+            with np.load(self._path(key)) as f:
+                entry = dict(f)
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        if self.topology(entry["topology"].item()) is None:
+            return None
+        with self.lock:
+            self.memory[key] = entry
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return entry
+
+    def get(self, key):
+        # -> dict of arrays, or None
+        entry = self._load(key)
+        if entry is None:
+            return None
+        for used in (key, self._topology_key(entry["topology"].item())):
+            if not self._touch(used):
+                return None
+        return entry
+
+    def _touch(self, key):
+        # Mark key as just used -> False if its file is gone (evicted by
+        # another session, deleted by hand)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            self._drop(key)
+            return False
+        return True
+
+    def topology(self, topology):
+        with self.lock:
+            if topology in self.topologies:
+                return self.topologies[topology]
+        try:
+            with np.load(self._topology_path(topology)) as f:
+                arrays = dict(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._drop(self._topology_key(topology))
+            return None
+        with self.lock:
+            self.topologies[topology] = arrays
+        return arrays
+
+    def prefetch(self, keys):
+        # Load these entries in the background; stale requests are dropped
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        while not self.todo.empty():
+            try:
+                self.todo.get_nowait()
+            except queue.Empty:
+                break
+        for key in keys:
+            self.todo.put(key)
+
+    def _run(self):
+        while True:
+            key = self.todo.get()
+            if key is None:
+                break
+            self._load(key)
+
+    def close(self):
+        if self.thread is not None:
+            self.todo.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def put(self, key, topology, entry):
+        topo_key = self._topology_key(entry["topology"].item())
+        if not os.path.exists(self._path(topo_key)):
+            self._write(self._path(topo_key), topology)
+        self._write(self._path(key), entry)
+        with self.lock:
+            for written in (topo_key, key):
+                self.entries[written] = os.path.getsize(self._path(written))
+                self.entries.move_to_end(written)
+        self.evict(keep=(key, topo_key))
+
+    def _write(self, path, arrays):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, path)
+
+    def evict(self, keep=()):
+        total = self.size()
+        for key in list(self.entries):
+            if total <= self.max_bytes:
+                break
+            if key not in keep:
+                total -= self.entries[key]
+                self._drop(key)
+
+    def _drop(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.memory.pop(key, None)
+            if key.startswith(TOPOLOGY_DIR + "/"):
+                self.topologies.pop(key[len(TOPOLOGY_DIR) + 1:], None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for key in list(self.entries):
+            self._drop(key)
+        for name in os.listdir(os.path.join(self.directory, TOPOLOGY_DIR)):
+            os.remove(os.path.join(self.directory, TOPOLOGY_DIR, name))
+        self.topologies.clear()
+
+
+def _domain_size(mesh, domain):
+    return {"POINT": len(mesh.vertices), "FACE": len(mesh.polygons), "CORNER": len(mesh.loops)}[domain]
+
+
+def capture(obj):
+    # Evaluated mesh of obj -> (topology arrays, entry arrays), or None
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        if len(mesh.vertices) == 0:
+            return None
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        co = co.reshape(-1, 3)
+        loop_vertex = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertex)
+        loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_total)
+
+        digest = hashlib.sha1()
+        for arr in (co[:, :2], loop_vertex, loop_start):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+        topology = {
+            "co": co, "loop_vertex": loop_vertex, "loop_start": loop_start, "loop_total": loop_total,
+            "materials": np.array(json.dumps([m.name if m else None for m in mesh.materials])),
+        }
+        entry = {"topology": np.array(digest.hexdigest()[:16]), "z": co[:, 2].copy()}
+
+        layout = {}
+        for attr in mesh.attributes:
+            if attr.name == "position" or attr.name.startswith(".") or attr.domain not in DOMAINS:
+                continue
+            if attr.data_type not in ATTRIBUTE_TYPES:
+                continue
+            prop, dtype, width = ATTRIBUTE_TYPES[attr.data_type]
+            values = np.empty(_domain_size(mesh, attr.domain) * width, dtype=dtype)
+            attr.data.foreach_get(prop, values)
+            entry[f"attr_{len(layout)}"] = values
+            layout[attr.name] = (attr.data_type, attr.domain)
+        entry["attributes"] = np.array(json.dumps(layout))
+        return topology, entry
+    finally:
+        evaluated.to_mesh_clear()
+
+
+def _build_mesh(topology, name):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(topology["co"]))
+    mesh.vertices.foreach_set("co", topology["co"].ravel())
+    mesh.loops.add(len(topology["loop_vertex"]))
+    mesh.loops.foreach_set("vertex_index", topology["loop_vertex"])
+    mesh.polygons.add(len(topology["loop_start"]))
+    mesh.polygons.foreach_set("loop_start", topology["loop_start"])
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", topology["loop_total"])
+    mesh.update(calc_edges=True)
+    for material in json.loads(topology["materials"].item()):
+        mesh.materials.append(bpy.data.materials.get(material) if material else None)
+    return mesh
+
+
+def cache_object(controller):
+    obj = bpy.data.objects.get(CACHE_OBJECT)
+    if obj is None:
+        obj = bpy.data.objects.new(CACHE_OBJECT, bpy.data.meshes.new(CACHE_OBJECT))
+        controller.users_collection[0].objects.link(obj)
+        obj.hide_render = True
+    return obj
+
+
+def restore(controller, topology, entry):
+    # Show a cached entry on the HexGridCache object -> that object
+    obj = cache_object(controller)
+    topo_id = entry["topology"].item()
+    if obj.get("topology") != topo_id:
+        old = obj.data
+        obj.data = _build_mesh(topology, CACHE_OBJECT)
+        bpy.data.meshes.remove(old)
+        obj["topology"] = topo_id
+    obj.matrix_world = controller.matrix_world.copy()
+
+    mesh = obj.data
+    co = topology["co"].copy()
+    co[:, 2] = entry["z"]
+    mesh.vertices.foreach_set("co", co.ravel())
+
+    layout = json.loads(entry["attributes"].item())
+    for i, (name, (data_type, domain)) in enumerate(layout.items()):
+        attr = mesh.attributes.get(name)
+        if attr is None or attr.data_type != data_type or attr.domain != domain:
+            if attr is not None:
+                mesh.attributes.remove(attr)
+            try:
+                attr = mesh.attributes.new(name, data_type, domain)
+            except RuntimeError:
+                continue  # built-in attribute this version cannot create
+        attr.data.foreach_set(ATTRIBUTE_TYPES[data_type][0], entry[f"attr_{i}"])
+    mesh.update()
+    return obj
+
+
+def show_terrain(hg, cache):
+    # update() with the terrain taken from the cache when possible -> True on a hit
+    controller = hg.mod.id_data
+    key = terrain_key(hg)
+    with timing.stage("cache.get"):
+        entry = cache.get(key)
+        topology = cache.topology(entry["topology"].item()) if entry is not None else None
+
+    if topology is not None:
+        with timing.stage("cache.restore"):
+            obj = restore(controller, topology, entry)
+        hg.mod.show_viewport = False
+        obj.hide_viewport = False
+        hg.update(terrain=False)
+        return True
+
+    obj = bpy.data.objects.get(CACHE_OBJECT)
+    if obj is not None:
+        obj.hide_viewport = True
+    hg.update()
+    with timing.stage("cache.capture"):
+        captured = capture(controller)
+    if captured is not None:
+        cache.put(key, *captured)
+    return False
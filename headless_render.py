@@ -0,0 +1,193 @@
+# Unattended dataset generation, one still per seed:
+#
+#   blender scene.blend --background --python headless_render.py -- \
+#       --start 0 --stop 10000 --out renders/
+#
+# Every rendered seed gets a row in <out>/manifest.csv (or --manifest, any
+# param_store backend) with the parameters save_params writes plus the image
+# path. Seeds that already have both a manifest row and an image are skipped,
+# so an interrupted run can just be started again.
+#
+# With --views M each terrain is evaluated once and rendered from M camera
+# and light draws (HexGridParams.set_view); rows are keyed by (seed, view_id)
+# in <out>/manifest_views.csv and images are seed_XXXXXXX_vYY.png.
+#
+# With --serve the process instead reads seeds from stdin, one per line, and
+# reports each finished render as a "@@DONE <json row>" line on stdout (a
+# JSON list of rows with --views); this is how render_farm.py drives several
+# Blender workers.
+import argparse
+import json
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from helper_functions import widened_culler
+from hexgrid_params import HexGridParams
+from param_store import open_store
+from render_paths import default_manifest, image_path, manifest_key
+import timing
+
+
+def parse_args(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="headless_render.py")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=None, help="exclusive")
+    parser.add_argument("--out", required=True, help="output directory for images")
+    parser.add_argument("--manifest", default=None, help="defaults to <out>/manifest.csv")
+    parser.add_argument("--res-percent", type=int, default=100)
+    parser.add_argument("--overwrite", action="store_true", help="re-render seeds already in the manifest")
+    parser.add_argument("--serve", action="store_true", help="render seeds read from stdin (render_farm worker)")
+    parser.add_argument("--views", type=int, default=1, help="camera/light views rendered per terrain")
+    parser.add_argument("--timing", default=None, metavar="PREFIX",
+                        help="record stage timings, write PREFIX.json and PREFIX.trace.json at exit")
+    args = parser.parse_args(argv)
+    if args.stop is None and not args.serve:
+        parser.error("--stop is required unless --serve is given")
+    return args
+
+
+def get_hexgrid():
+    mod = bpy.data.objects["HexGridController"].modifiers["HexGrid"]
+    node_group = bpy.data.node_groups['HexGridGroup']
+    return mod, node_group
+
+
+def setup_render(res_percent=100):
+    render = bpy.context.scene.render
+    render.image_settings.file_format = 'PNG'
+    render.resolution_percentage = res_percent
+
+
+def render_still(hg, path, cull=True):
+    hg.update(cull=cull)
+    bpy.data.objects['Plane'].location[2] = hg.instance_scale
+
+    bpy.context.scene.render.filepath = path
+    with timing.stage("render"):
+        bpy.ops.render.render(write_still=True)
+
+
+def render_seed(mod, node_group, seed, path):
+    hg = HexGridParams(mod, node_group, seed)
+    with timing.stage("set_params"):
+        hg.set_params()
+    render_still(hg, path)
+    return hg
+
+
+def render_views(mod, node_group, seed, out_dir, views):
+    # The culler follows the camera and would re-evaluate the geometry nodes
+    # for every view. It is widened to the whole grid once per seed instead
+    # and only the camera and light move (update(cull=False)), so the terrain
+    # is evaluated for the first view only. Each view then renders the uncut
+    # grid, so hexes outside the frame can cast shadows into it.
+    hg = HexGridParams(mod, node_group, seed)
+    hg.set_params()
+    rows = []
+    with widened_culler():
+        for view_id in range(views):
+            t0 = time.perf_counter()
+            hg.set_view(view_id)
+            path = image_path(out_dir, seed, view_id)
+            render_still(hg, path, cull=False)
+            rows.append(manifest_row(hg, path, out_dir, time.perf_counter() - t0))
+    return rows
+
+
+def manifest_row(hg, path, out_dir, seconds):
+    row = hg.to_row(valid=None)
+    row["image"] = os.path.relpath(path, out_dir)
+    row["render_time"] = seconds
+    return row
+
+
+def is_rendered(store, out_dir, seed, views=1):
+    if views == 1:
+        return seed in store and os.path.exists(image_path(out_dir, seed))
+    return all((seed, v) in store and os.path.exists(image_path(out_dir, seed, v)) for v in range(views))
+
+
+def render_range(seeds, out_dir, manifest=None, res_percent=100, overwrite=False, views=1):
+    os.makedirs(out_dir, exist_ok=True)
+    store = open_store(manifest or default_manifest(out_dir, views), key=manifest_key(views))
+    mod, node_group = get_hexgrid()
+    setup_render(res_percent)
+
+    done = skipped = 0
+    t_start = time.perf_counter()
+    for seed in seeds:
+        if not overwrite and is_rendered(store, out_dir, seed, views):
+            skipped += 1
+            continue
+
+        # Manifest rows only after the images are on disk, so a crash
+        # mid-render leaves the seed to be redone on the next run
+        if views == 1:
+            t0 = time.perf_counter()
+            path = image_path(out_dir, seed)
+            hg = render_seed(mod, node_group, seed, path)
+            store.upsert(manifest_row(hg, path, out_dir, time.perf_counter() - t0))
+        else:
+            store.upsert_many(render_views(mod, node_group, seed, out_dir, views))
+        done += 1
+        print(f"Rendered seed {seed} ({done} done, {skipped} skipped)")
+
+    elapsed = time.perf_counter() - t_start
+    print(f"Finished: {done} rendered, {skipped} skipped in {elapsed:.1f}s")
+    timing.print_summary()
+    return done, skipped
+
+
+def serve(out_dir, res_percent=100, views=1):
+    os.makedirs(out_dir, exist_ok=True)
+    mod, node_group = get_hexgrid()
+    setup_render(res_percent)
+
+    print("@@READY", flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        seed = int(line)
+        try:
+            if views == 1:
+                t0 = time.perf_counter()
+                path = image_path(out_dir, seed)
+                hg = render_seed(mod, node_group, seed, path)
+                result = manifest_row(hg, path, out_dir, time.perf_counter() - t0)
+            else:
+                result = render_views(mod, node_group, seed, out_dir, views)
+        except Exception as e:
+            print(f"@@FAIL {seed} {e!r}", flush=True)
+            continue
+        print("@@DONE " + json.dumps(result, default=str), flush=True)
+
+
+def main():
+    args = parse_args()
+    if args.timing:
+        timing.enable()
+    try:
+        run(args)
+    finally:
+        if args.timing:
+            timing.export_json(args.timing + ".json")
+            timing.export_chrome_trace(args.timing + ".trace.json")
+
+
+def run(args):
+    if args.serve:
+        serve(args.out, args.res_percent, args.views)
+    else:
+        render_range(range(args.start, args.stop), args.out, args.manifest, args.res_percent, args.overwrite,
+                     args.views)
+
+
+if __name__ == "__main__":
+    main()
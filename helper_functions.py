@@ -1,6 +1,8 @@
 import bpy
+import math
 import numpy as np
 import colorsys
+from contextlib import contextmanager
 from mathutils import Vector, Euler
 
 def inspect_mod_inputs(mod):
@@ -14,6 +16,54 @@ def inspect_mod_inputs(mod):
                 if socket.is_output and socket.name != "":
                     print(f"{i}: {socket.identifier} ({socket.name}) = {socket.default_value}")
                     
+_bindings = {}
+
+class InputBindings:
+    # Socket name -> modifier property identifier ("Socket_2", "Input_3", ...)
+    # for one node group, read from its interface (Blender 4.x) or from the
+    # Group Input node like inspect_mod_inputs.
+    def __init__(self, node_group):
+        self.node_group_name = node_group.name
+        if hasattr(node_group, "interface"):
+            sockets = [
+                item for item in node_group.interface.items_tree
+                if item.item_type == 'SOCKET' and item.in_out == 'INPUT'
+            ]
+        else:
+            sockets = [s for s in node_group.nodes["Group Input"].outputs if s.name != ""]
+        self.ids = {s.name: s.identifier for s in sockets}
+
+    def __getitem__(self, name):
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise KeyError(
+                f"Node group '{self.node_group_name}' has no input '{name}' "
+                f"(inputs: {', '.join(self.ids)})"
+            ) from None
+
+    def apply(self, mod, values):
+        # Resolve everything first so a missing input fails before any write
+        items = [(self[name], value) for name, value in values.items()]
+        for identifier, value in items:
+            mod[identifier] = value
+
+def _interface_version(node_group):
+    if hasattr(node_group, "interface"):
+        return len(node_group.interface.items_tree)
+    return len(node_group.nodes["Group Input"].outputs)
+
+def input_bindings(node_group):
+    # Cached per node group; rebuilt when its inputs are added or removed.
+    # Call invalidate_input_bindings() after renaming or reordering sockets.
+    key = (node_group.as_pointer(), _interface_version(node_group))
+    if key not in _bindings:
+        _bindings[key] = InputBindings(node_group)
+    return _bindings[key]
+
+def invalidate_input_bindings():
+    _bindings.clear()
+
 generic_props = {p.identifier for p in bpy.types.Node.bl_rna.properties}
 
 def inspect_node(node):
@@ -45,6 +95,8 @@ def inspect_node(node):
         print(f"Output {i} - {socket.name}")
 
 def generate_distinct_colors(rng, n_colors):
+    # Scalar colorsys is faster than batch_sampler.hsv_to_rgb for a handful
+    # of colours; both give the same values
     colors = []
     for i in range(n_colors):
         h = rng.random()
@@ -54,39 +106,76 @@ def generate_distinct_colors(rng, n_colors):
         colors.append(rgb)
     return np.array(colors)
 
-def camera_move_and_cull(cam, cont, r, phi, theta, target, margin):
-    # Convert spherical → Cartesian
-    x = r * np.sin(theta) * np.cos(phi)
-    y = r * np.sin(theta) * np.sin(phi)
-    z = r * np.cos(theta)
+@contextmanager
+def widened_culler(cont=None, factor=1e4):
+    # Camera_culler scaled up so it trims nothing, restored on exit. The
+    # caller runs view_layer.update() as needed.
+    cont = cont or bpy.data.objects.get("Camera_culler")
+    if cont is None:
+        yield None
+        return
+    scale = cont.scale.copy()
+    cont.scale = scale * factor
+    try:
+        yield cont
+    finally:
+        cont.scale = scale
 
-    cam.location = Vector((x, y, z))
+def terrain_half_extent(obj=None, cont=None):
+    # Half width of the evaluated hex grid in X and Y (world units), for
+    # frustum_check. Camera_culler trims the grid to the current view, so it
+    # is widened while the grid is measured; the footprint comes from the
+    # Rows/Cols and hex size in the .blend and does not change with the seed.
+    obj = obj or bpy.data.objects["HexGridController"]
+    try:
+        with widened_culler(cont):
+            bpy.context.view_layer.update()
+            evaluated = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+            corners = np.array([tuple(obj.matrix_world @ Vector(c)) for c in evaluated.bound_box])
+    finally:
+        bpy.context.view_layer.update()
+    return tuple((corners.max(axis=0) - corners.min(axis=0))[:2] / 2)
 
-    # Make camera look at origin
-    target = Vector((0, 0, 0))
-    direction = target - cam.location
-    cam.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
+def camera_clip(cam=None):
+    cam = cam or bpy.data.objects["Camera"]
+    return cam.data.clip_start, cam.data.clip_end
 
-    resx = bpy.data.scenes["Scene"].render.resolution_x
-    resy = bpy.data.scenes["Scene"].render.resolution_y
-    ortho_scale = cam.data.ortho_scale
-    
-    if resx >= resy:
-        
-        fac = 1/(np.power(resx/resy,2))
+def scene_resolution(scene=None):
+    render = (scene or bpy.data.scenes["Scene"]).render
+    return render.resolution_x, render.resolution_y
 
-        cont.scale[0] = ortho_scale * fac * (margin + 1) * resx/resy
-        cont.scale[1] = ortho_scale * fac * (margin + 1)
-        cont.scale[2] = ortho_scale * fac * 1000
+def apply_camera_pose(cam, cont, location, rotation, culler_scale):
+    # One row of camera_math.camera_poses onto the camera and its culler
+    cam.location = Vector(location)
+    cam.rotation_euler = Euler(rotation, 'XYZ')
+    cont.scale = Vector(culler_scale)
+    cont.rotation_euler = Euler(rotation, 'XYZ')
 
-        cont.rotation_euler = cam.rotation_euler
-        
-    else:
-        
-        fac = 1/(np.power(resy/resx,2))
+def camera_move(cam, r, phi, theta, target):
+    # Camera on a sphere of radius r around target, looking at it. One pose
+    # is cheaper through mathutils; camera_math.camera_poses +
+    # apply_camera_pose are for batches.
+    target = Vector(target)
+    cam.location = target + Vector((
+        r * math.sin(theta) * math.cos(phi),
+        r * math.sin(theta) * math.sin(phi),
+        r * math.cos(theta),
+    ))
+    cam.rotation_euler = (target - cam.location).to_track_quat('-Z', 'Y').to_euler()
 
-        cont.scale[0] = ortho_scale * fac * (margin + 1) 
-        cont.scale[1] = ortho_scale * fac * (margin + 1) * resy/resx
-        cont.scale[2] = ortho_scale * fac * 1000
+def cull_to_camera(cam, cont, margin, resolution=None):
+    # Culler box sized to the orthographic frame, same box as
+    # camera_math.culler_scale. The geometry nodes read the culler, so moving
+    # it re-evaluates them.
+    if resolution is None:
+        resolution = scene_resolution()
+    resx, resy = resolution
+    aspect = max(resx, resy) / min(resx, resy)
+    sx, sy = (aspect, 1.0) if resx >= resy else (1.0, aspect)
+    base = cam.data.ortho_scale / aspect ** 2
+    cont.scale = Vector((base * (margin + 1) * sx, base * (margin + 1) * sy, base * 1000))
+    cont.rotation_euler = cam.rotation_euler
 
-        cont.rotation_euler = cam.rotation_euler
\ No newline at end of file
+def camera_move_and_cull(cam, cont, r, phi, theta, target, margin, resolution=None):
+    camera_move(cam, r, phi, theta, target)
+    cull_to_camera(cam, cont, margin, resolution)
@@ -1,9 +1,27 @@
 import bpy
 import numpy as np
-import pandas as pd
 import os
-from mathutils import Vector, Euler
-from helper_functions import generate_distinct_colors, camera_move_and_cull
+from mathutils import Vector
+from helper_functions import generate_distinct_colors, camera_move, cull_to_camera, input_bindings
+from param_store import open_store
+from render_paths import VIEW_KEY
+import timing
+
+# Last state written by HexGridParams.update, per modifier
+_applied_state = {}
+
+
+def _key(value):
+    # Comparable snapshot of a parameter value (floats, arrays, Vectors)
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return tuple(_key(v) for v in value)
+
+
+def reset_applied_state():
+    _applied_state.clear()
 
 
 class HexGridParams:
@@ -33,6 +51,9 @@ class HexGridParams:
         self.camera_polar = None
         self.camera_target = None
         self.camera_scale = None
+        self.view_id = None
+        # Extra columns saved with the parameters, e.g. seed_proposer provenance
+        self.provenance = {}
         
         self.csv_path = None
         
@@ -71,57 +92,134 @@ class HexGridParams:
         self.camera_target = Vector((0, 0, 0))
         self.camera_scale = self.rng.uniform(30, 150)
 
-    def update(self):
-        ids = [i[0] for i in self.mod.items() if "attribute" not in i[0]]
-        names = ["Rows", "Cols", "Seed", "Offset", "Scale", "Detail", "Roughness", "Lacunarity", "Distortion", "Height", "Color 1", "Color 2", "Color 3"]
-        d = dict(zip(names, ids))
-
-#        self.mod[d["Rows"]] = self.rows
-#        self.mod[d["Cols"]] = self.cols
-        self.mod[d["Seed"]] = self.seed
-        self.mod[d["Offset"]] = self.offset
-        self.mod[d["Scale"]] = self.scale
-        self.mod[d["Detail"]] = self.detail
-        self.mod[d["Roughness"]] = self.roughness
-        self.mod[d["Lacunarity"]] = self.lacunarity
-        self.mod[d["Distortion"]] = self.distortion
-        self.mod[d["Height"]] = self.instance_scale
-        
-        color_ramp = self.nodes["Color Ramp"]
+    def set_view(self, view_id):
+        # Re-draws only the light and camera from their own stream, so views
+        # 0..M-1 of a terrain are reproducible and independent of each other.
+        # The terrain (and update()'s modifier state) is left alone.
+        rng = np.random.default_rng([self.seed, view_id])
+        self.view_id = view_id
+        self.light_altitude = rng.uniform(0.2, 1.0)
+        self.light_azimuth = rng.uniform(0, 2*np.pi)
+        self.camera_azimuth = rng.uniform(0, 2*np.pi)
+        self.camera_polar = rng.uniform(1/9*np.pi, np.pi/3)
+        self.camera_scale = rng.uniform(30, 150)
+
+    def modifier_inputs(self):
+        # Modifier input values by socket name
+        inputs = {
+#            "Rows": self.rows,
+#            "Cols": self.cols,
+            "Seed": self.seed,
+            "Offset": self.offset,
+            "Scale": self.scale,
+            "Detail": self.detail,
+            "Roughness": self.roughness,
+            "Lacunarity": self.lacunarity,
+            "Distortion": self.distortion,
+            "Height": self.instance_scale,
+        }
         for i, col in enumerate(self.colors):
-            color_ramp.color_ramp.elements[i].color = (*col, 1.0)
-            self.mod[d[f"Color {1+i}"]] = (*col, 1.0)
-            
-        sun = bpy.data.objects.get("Sun")
-        if sun and sun.type == "LIGHT" and sun.data.type == "SUN":
-            sun.rotation_euler = (self.light_altitude, 0, self.light_azimuth)
-            
+            inputs[f"Color {1+i}"] = (*col, 1.0)
+        return inputs
+
+    def applied_state(self):
+        # What update() writes, split by what each part invalidates:
+        # terrain inputs, ramp colours and the culler re-evaluate the geometry
+        # nodes, light and camera only move objects. Camera_culler follows the
+        # camera, so it has the camera's state.
+        camera = _key((self.camera_scale, self.camera_dist, self.camera_azimuth,
+                       self.camera_polar, self.camera_target))
+        return {
+            "terrain": {name: _key(value) for name, value in self.modifier_inputs().items()},
+            "ramp": _key(self.colors),
+            "light": _key((self.light_altitude, self.light_azimuth)),
+            "camera": camera,
+            "culler": camera,
+        }
+
+    def update(self, force=False, terrain=True, cull=True):
+        # Only touches what changed since the last update() on this modifier.
+        # A light-only change skips the geometry nodes evaluation; a camera
+        # change does not, because the culler follows the camera. cull=False
+        # moves the camera and leaves the culler where it is, for callers that
+        # widened it (see headless_render.render_views).
+        # Use force=True (or reset_applied_state) after editing the scene by hand.
+        # terrain=False moves light and camera only and leaves the modifier
+        # alone (geometry_cache shows a cached terrain instead).
+        with timing.stage("update.diff"):
+            state = self.applied_state()
+            last = {} if force else _applied_state.get(self.mod.as_pointer(), {})
+            inputs = self.modifier_inputs()
+
+            changed_inputs = {}
+            if terrain:
+                changed_inputs = {
+                    name: inputs[name] for name, value in state["terrain"].items()
+                    if last.get("terrain", {}).get(name) != value
+                }
+            else:
+                state["terrain"], state["ramp"] = last.get("terrain"), last.get("ramp")
+            if not cull:
+                state["culler"] = last.get("culler")
+        if changed_inputs:
+            with timing.stage("update.modifier"):
+                input_bindings(self.node_group).apply(self.mod, changed_inputs)
+
+        if state["ramp"] != last.get("ramp"):
+            with timing.stage("update.color_ramp"):
+                color_ramp = self.nodes["Color Ramp"]
+                for i, col in enumerate(self.colors):
+                    color_ramp.color_ramp.elements[i].color = (*col, 1.0)
+
+        if state["light"] != last.get("light"):
+            with timing.stage("update.light"):
+                sun = bpy.data.objects.get("Sun")
+                if sun and sun.type == "LIGHT" and sun.data.type == "SUN":
+                    sun.rotation_euler = (self.light_altitude, 0, self.light_azimuth)
+
         cam = bpy.data.objects.get("Camera")
-        cont = bpy.data.objects.get("Camera_culler")
-        
-        cam.data.ortho_scale = self.camera_scale
-        camera_move_and_cull(cam, cont, self.camera_dist, self.camera_azimuth, self.camera_polar, self.camera_target, .2)
+        if state["camera"] != last.get("camera"):
+            with timing.stage("update.camera"):
+                cam.data.ortho_scale = self.camera_scale
+                camera_move(cam, self.camera_dist, self.camera_azimuth, self.camera_polar, self.camera_target)
 
-        bpy.context.view_layer.update()
-        self.mod.show_viewport = True
+        if state["culler"] != last.get("culler"):
+            with timing.stage("update.culler"):
+                cull_to_camera(cam, bpy.data.objects.get("Camera_culler"), .2)
+
+        changed = [group for group in state if state[group] != last.get(group)]
+        shown = terrain and not self.mod.show_viewport
+        if shown:
+            self.mod.show_viewport = True
+        if changed or shown:
+            # Geometry nodes evaluation happens here when the terrain, ramp or
+            # culler changed
+            with timing.stage("update.view_layer"):
+                bpy.context.view_layer.update()
+        _applied_state[self.mod.as_pointer()] = state
+        return changed
         
-    def load_params(self,seed,path=None):
+    def load_params(self,seed,path=None,view_id=None):
         if path is None:
             path = self.csv_path
         
         if not os.path.exists(path):
             raise FileNotFoundError(f"CSV file not found at: {path}")
         
-        df = pd.read_csv(path)
-        
-        if seed not in df["seed"].values:
+        try:
+            if view_id is None:
+                row = open_store(path).get(seed)
+            else:
+                row = open_store(path, key=VIEW_KEY).get((seed, view_id))
+        except KeyError:
             raise ValueError(f"Seed {seed} not found in CSV.")
+        self.load_row(row, path, view_id)
 
-        self.seed = seed
+    def load_row(self, row, path=None, view_id=None):
+        # load_params for a row already read from the store
+        self.seed = int(row["seed"])
         self.rng = np.random.default_rng(seed=self.seed)
 
-        row = df.loc[df["seed"] == seed].iloc[0]
-        
         self.scale = row["scale"]
         self.detail = row["detail"]
         self.roughness = row["roughness"]
@@ -133,8 +231,9 @@ class HexGridParams:
         self.camera_dist = row["camera_dist"]
         self.camera_azimuth = row["camera_azimuth"]
         self.camera_polar = row["camera_polar"]
-        self.camera_target = row["camera_target"]
+        self.camera_target = Vector((row["camera_target_x"], row["camera_target_y"], row["camera_target_z"]))
         self.camera_scale = row["camera_scale"]
+        self.view_id = view_id
 
         colors = []
         for i in range(self.n_colors):
@@ -149,10 +248,7 @@ class HexGridParams:
         
         self.csv_path = path
 
-    def save_params(self, path=None, valid=None):
-        if path is None:
-            path = self.csv_path
-            
+    def to_row(self, valid=None):
         data = {
             "seed": self.seed,
             "scale": self.scale,
@@ -166,7 +262,9 @@ class HexGridParams:
             "camera_dist": self.camera_dist,
             "camera_azimuth": self.camera_azimuth,
             "camera_polar": self.camera_polar,
-            "camera_target": self.camera_target,
+            "camera_target_x": self.camera_target[0],
+            "camera_target_y": self.camera_target[1],
+            "camera_target_z": self.camera_target[2],
             "camera_scale": self.camera_scale,
             "valid": valid
         }
@@ -174,26 +272,23 @@ class HexGridParams:
             data[f"color_{i}_r"] = self.colors[i, 0]
             data[f"color_{i}_g"] = self.colors[i, 1]
             data[f"color_{i}_b"] = self.colors[i, 2]
-            
-        for i in range(self.n_colors):
-            data["offset_x"] = self.offset[0]
-            data["offset_y"] = self.offset[1]
-            data["offset_z"] = self.offset[2]
 
-        df_new = pd.DataFrame([data])
+        data["offset_x"] = self.offset[0]
+        data["offset_y"] = self.offset[1]
+        data["offset_z"] = self.offset[2]
 
-        if os.path.exists(path):
-            df_existing = pd.read_csv(path)
-            
-            if self.seed in df_existing["seed"].values:
-                idx = df_existing.index[df_existing["seed"] == self.seed][0]
-                for col in df_new.columns:
-                    df_existing.at[idx, col] = df_new.at[0, col]
-            else:
-                df_existing = pd.concat([df_existing, df_new], ignore_index=True)
-            df_existing.to_csv(path, index=False)
-        else:
-            df_new.to_csv(path, mode="w", header=True, index=False)
+        if self.view_id is not None:
+            data["view_id"] = self.view_id
+        data.update(self.provenance)
+        return data
+
+    def save_params(self, path=None, valid=None):
+        if path is None:
+            path = self.csv_path
+
+        key = "seed" if self.view_id is None else VIEW_KEY
+        with timing.stage("save_params"):
+            open_store(path, key=key).upsert(self.to_row(valid))
             
         self.csv_path = path
         
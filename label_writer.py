@@ -0,0 +1,200 @@
+# Writes labels to the parameter store from a background thread, so marking
+# a seed costs microseconds on Blender's UI thread whatever the store size.
+#
+#   writer = open_writer("data.csv")
+#   writer.put(hg.to_row(valid=True))
+#   ...
+#   release_writer(writer)   # the last user writes whatever is still queued
+#
+# put() appends the row to an append-only JSON-lines journal (path +
+# ".journal") and queues it; the writer thread upserts queued rows in
+# batches once batch_size rows are waiting or the oldest has waited
+# flush_interval seconds. The journal is fsynced before each batch and
+# emptied whenever everything in it has reached the store. Rows still in
+# the journal when Blender dies are written by the next LabelWriter on the
+# same store before anything else.
+#
+# There must be one writer per journal: emptying the journal would drop
+# rows another writer had journalled but not stored yet. open_writer()
+# hands out one shared writer per store in the process (like open_store),
+# so Human_in_the_middle_validation and thumbnail_review can label into the
+# same data.csv; the first caller's batch_size and flush_interval apply.
+# Separate processes on one store need their own journal= paths.
+#
+# The writer thread opens its own store (SQLite connections are per
+# thread); readers in other threads see a batch once it is committed, and
+# flush() waits for that.
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from param_store import store_class
+
+_STOP = object()
+FLUSH_POLL = 0.1  # seconds between writer thread liveness checks in flush()
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _json_default(value):
+    # numpy scalars / mathutils vectors
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class LabelWriter:
+    def __init__(self, path, key="seed", journal=None, batch_size=50, flush_interval=2.0):
+        self.path = path
+        self.key = key
+        self.journal_path = journal or path + ".journal"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.users = 0  # open_writer() callers that have not released it
+
+        self.todo = queue.Queue()
+        self.lock = threading.Lock()
+        replay = self._read_journal()
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+        if self.journal.tell() and not self._ends_with_newline():
+            self.journal.write("\n")  # close a torn last line before appending
+        # Rows journalled / stored since the journal was last emptied
+        self.journaled = len(replay)
+        self.stored = 0
+        if replay:
+            print(f"Label writer: replaying {len(replay)} journalled labels")
+        for row in replay:
+            self.todo.put(row)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _ends_with_newline(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _read_journal(self):
+        rows = []
+        if not os.path.exists(self.journal_path):
+            return rows
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # torn last line from a crash mid-write
+        return rows
+
+    def put(self, row):
+        self.put_many([row])
+
+    def put_many(self, rows):
+        lines = "".join(json.dumps(row, default=_json_default) + "\n" for row in rows)
+        with self.lock:
+            self.journal.write(lines)
+            self.journal.flush()
+            self.journaled += len(rows)
+        for row in rows:
+            self.todo.put(dict(row))
+
+    def flush(self, timeout=None):
+        # Block until everything put so far is in the store -> True if it is.
+        # Gives up after timeout seconds, or as soon as the writer thread is
+        # gone; unstored rows stay in the journal either way.
+        done = threading.Event()
+        self.todo.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = FLUSH_POLL if deadline is None else min(FLUSH_POLL, deadline - time.monotonic())
+            if done.wait(max(0.0, wait)):
+                return True
+            if not self.thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                return done.is_set()
+
+    def pending(self):
+        with self.lock:
+            return self.journaled - self.stored
+
+    def close(self, timeout=30):
+        if self.thread.is_alive():
+            self.todo.put(_STOP)
+            self.thread.join(timeout)
+        with self.lock:
+            self.journal.close()
+
+    def _write(self, store, rows):
+        # -> True once rows are stored; the journal is emptied when it has
+        # nothing left that is not
+        try:
+            os.fsync(self.journal.fileno())
+            store.upsert_many(rows)
+        except Exception as e:
+            print(f"Label writer: {len(rows)} labels not written yet ({e}); retrying")
+            return False
+        with self.lock:
+            self.stored += len(rows)
+            if self.stored == self.journaled:
+                self.journal.truncate(0)
+                self.journal.seek(0)
+                self.journaled = self.stored = 0
+        return True
+
+    def _run(self):
+        store = store_class(self.path)(self.path, self.key)
+        batch, waiters = [], []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.todo.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or waiters or stopping):
+                if self._write(store, batch):
+                    batch, deadline = [], None
+                else:
+                    deadline = time.monotonic() + self.flush_interval
+            if not batch:
+                for done in waiters:
+                    done.set()
+                waiters = []
+        store.close()
+
+
+def open_writer(path, key="seed", **options):
+    # The process's writer for this store, started on first use; pair each
+    # call with release_writer()
+    path = os.path.abspath(path)
+    key = key if isinstance(key, str) else tuple(key)
+    with _writers_lock:
+        writer = _writers.get((path, key))
+        if writer is None:
+            writer = _writers[path, key] = LabelWriter(path, key, **options)
+        writer.users += 1
+    return writer
+
+
+def release_writer(writer, timeout=30):
+    # Closes the writer once its last user has released it
+    with _writers_lock:
+        writer.users -= 1
+        if writer.users > 0:
+            return
+        if _writers.get((writer.path, writer.key)) is writer:
+            del _writers[writer.path, writer.key]
+    writer.close(timeout)
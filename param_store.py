@@ -0,0 +1,445 @@
+import csv
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+
+N_COLORS = 3
+
+PARAM_COLUMNS = [
+    "seed",
+    "scale",
+    "detail",
+    "roughness",
+    "lacunarity",
+    "distortion",
+    "instance_scale",
+    "light_altitude",
+    "light_azimuth",
+    "camera_dist",
+    "camera_azimuth",
+    "camera_polar",
+    "camera_target_x",
+    "camera_target_y",
+    "camera_target_z",
+    "camera_scale",
+    "valid",
+]
+PARAM_COLUMNS += [f"color_{i}_{c}" for i in range(N_COLORS) for c in "rgb"]
+PARAM_COLUMNS += ["offset_x", "offset_y", "offset_z"]
+
+# Fixed-width binary layout of PARAM_COLUMNS for .npy export. `valid` is
+# 1/0 with -1 for unlabelled rows.
+PARAM_DTYPE = np.dtype([
+    (c, np.int64 if c == "seed" else np.int8 if c == "valid" else np.float64) for c in PARAM_COLUMNS
+])
+
+# Older files store the camera target as str(Vector), e.g.
+# "<Vector (0.0000, 0.0000, 0.0000)>". Those rows are upgraded to the
+# camera_target_{x,y,z} columns when read.
+LEGACY_VECTORS = {"camera_target": ["camera_target_x", "camera_target_y", "camera_target_z"]}
+
+
+def _plain(value):
+    # numpy scalars / mathutils vectors -> values csv and sqlite understand
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def param_hash(row):
+    # Short digest of a row's parameters (PARAM_COLUMNS without the label),
+    # e.g. to tell whether a cached render still matches its seed
+    values = [_plain(row.get(c)) for c in PARAM_COLUMNS if c != "valid"]
+    return hashlib.sha1(repr(values).encode()).hexdigest()[:12]
+
+
+def parse_vector(text):
+    # "<Vector (x, y, z)>" -> [x, y, z]; missing values -> NaNs
+    if not isinstance(text, str):
+        return [np.nan] * 3
+    return [float(v) for v in text[text.index("(") + 1:text.rindex(")")].split(",")]
+
+
+def _upgrade_frame(df):
+    for old, cols in LEGACY_VECTORS.items():
+        if old not in df.columns:
+            continue
+        legacy = pd.DataFrame(df[old].map(parse_vector).tolist(), columns=cols, index=df.index)
+        for col in cols:
+            df[col] = df[col].fillna(legacy[col]) if col in df.columns else legacy[col]
+        df = df.drop(columns=old)
+    return df
+
+
+def _upgrade_row(row):
+    for old, cols in LEGACY_VECTORS.items():
+        if old in row:
+            values = parse_vector(row.pop(old))
+            for col, v in zip(cols, values):
+                if row.get(col) is None or row[col] != row[col]:
+                    row[col] = v
+    return row
+
+
+def _legacy_columns(columns):
+    # Stored columns needed to produce `columns` from an un-upgraded file
+    return [old for old, cols in LEGACY_VECTORS.items() if set(cols) & set(columns)]
+
+
+class ParamStore:
+    # Rows are dicts keyed by `key`; writing a row whose key already exists
+    # replaces it (last write wins). `key` is a column name, or a tuple of
+    # names for composite keys such as ("seed", "view_id"); rows are then
+    # looked up by tuples of values.
+    def __init__(self, path, key="seed"):
+        self.path = path
+        self.key = key
+        self.key_columns = [key] if isinstance(key, str) else list(key)
+
+    def row_key(self, row):
+        if isinstance(self.key, str):
+            return row[self.key]
+        return tuple(row[c] for c in self.key_columns)
+
+    def frame_keys(self, df):
+        if isinstance(self.key, str):
+            return df[self.key].tolist()
+        return list(zip(*(df[c].tolist() for c in self.key_columns)))
+
+    def _key_values(self, seed):
+        return (seed,) if isinstance(self.key, str) else tuple(seed)
+
+    def upsert(self, row):
+        self.upsert_many([row])
+
+    def upsert_many(self, rows):
+        raise NotImplementedError
+
+    def read_all(self, columns=None):
+        # `columns` limits what is read; names the store does not have are skipped
+        raise NotImplementedError
+
+    def get(self, seed):
+        df = self.read_all()
+        mask = np.ones(len(df), dtype=bool)
+        for col, value in zip(self.key_columns, self._key_values(seed)):
+            mask &= (df[col] == value).to_numpy()
+        match = df.loc[mask]
+        if match.empty:
+            raise KeyError(seed)
+        return match.iloc[-1].to_dict()
+
+    def seeds(self):
+        return self.frame_keys(self.read_all())
+
+    def __contains__(self, seed):
+        try:
+            self.get(seed)
+        except KeyError:
+            return False
+        return True
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def stamp(self):
+        # Changes whenever the stored data may have changed
+        stats = []
+        for path in (self.path, self.path + "-wal"):
+            if os.path.exists(path):
+                st = os.stat(path)
+                stats.append((st.st_mtime_ns, st.st_size))
+        return tuple(stats)
+
+    def close(self):
+        pass
+
+
+class CsvParamStore(ParamStore):
+    # Append-only CSV: each upsert is one appended line, duplicates of a key
+    # are resolved on read by keeping the last one. Rows are read in the order
+    # their keys were first written, so relabelling does not move a seed.
+    # `compact` drops the superseded lines.
+    #
+    # The parsed table is cached per process as {seed: row} and only
+    # re-parsed when the file's mtime or size no longer match what we last
+    # read or wrote, so `get` is a dict lookup.
+    def __init__(self, path, key="seed"):
+        super().__init__(path, key)
+        self._header = None
+        self._rows = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _cached_rows(self):
+        stamp = self._file_stamp()
+        if self._rows is None or stamp != self._stamp:
+            df = self.read_all()
+            self._rows = dict(zip(self.frame_keys(df), df.to_dict("records")))
+            self._stamp = stamp
+            self._header = None  # the file's own header, which may still have legacy columns
+        return self._rows
+
+    def _read_header(self):
+        if self._header is None and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, newline="") as f:
+                self._header = next(csv.reader(f))
+        return self._header
+
+    def upsert_many(self, rows):
+        rows = [{k: _plain(v) for k, v in row.items()} for row in rows]
+        if not rows:
+            return
+
+        # Only patch the cache if nobody else touched the file since we read it
+        cache_fresh = self._rows is not None and self._file_stamp() == self._stamp
+
+        header = self._read_header()
+        if header is None:
+            header = list(rows[0].keys())
+            with open(self.path, "w", newline="") as f:
+                csv.writer(f).writerow(header)
+            self._header = header
+
+        new_cols = [c for row in rows for c in row if c not in header]
+        if new_cols:
+            # Schema change: one full rewrite with the widened header
+            # (legacy columns are upgraded on the way)
+            df = self.read_all(dedupe=False)
+            for col in dict.fromkeys(new_cols):
+                if col not in df.columns:
+                    df[col] = None
+            df.to_csv(self.path, index=False)
+            self._header = list(df.columns)
+            header = self._header
+            cache_fresh = False
+
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=header)
+            writer.writerows(rows)
+
+        if cache_fresh:
+            for row in rows:
+                self._rows[self.row_key(row)] = _upgrade_row({c: np.nan if row.get(c) is None else row[c] for c in header})
+            self._stamp = self._file_stamp()
+        else:
+            self._rows = None
+
+    def read_all(self, columns=None, dedupe=True):
+        if not os.path.exists(self.path):
+            if columns is None:
+                columns = PARAM_COLUMNS + [c for c in self.key_columns if c not in PARAM_COLUMNS]
+            return pd.DataFrame(columns=columns)
+        usecols = None
+        if columns is not None:
+            header = self._read_header()
+            wanted = set(columns) | set(_legacy_columns(columns)) | set(self.key_columns)
+            usecols = [c for c in header if c in wanted]
+        # round_trip: pandas' default float parser is off by an ulp for most
+        # values, so loaded parameters would not match set_params
+        df = pd.read_csv(self.path, usecols=usecols, float_precision="round_trip")
+        if dedupe:
+            # Last write wins, but a key keeps the position it was first written
+            # at (like an in-place rewrite, and like SQLite's rowid order)
+            first_seen = df.groupby(self.key_columns, sort=False, dropna=False).ngroup().to_numpy()
+            df = df.drop_duplicates(subset=self.key_columns, keep="last")
+            df = df.iloc[np.argsort(first_seen[df.index], kind="stable")].reset_index(drop=True)
+        return _upgrade_frame(df)
+
+    def get(self, seed):
+        # Returns the cached row itself; callers must not mutate it
+        return self._cached_rows()[seed]
+
+    def seeds(self):
+        return list(self._cached_rows())
+
+    def __contains__(self, seed):
+        return seed in self._cached_rows()
+
+    def compact(self):
+        self.read_all().to_csv(self.path, index=False)
+        self._rows = None
+
+
+class SqliteParamStore(ParamStore):
+    # One table, `key` is the primary key so upserts are an index lookup.
+    # Columns are added on first use; values keep SQLite's dynamic typing.
+    table = "params"
+
+    def __init__(self, path, key="seed"):
+        super().__init__(path, key)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if isinstance(key, str):
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS {self.table} ("{key}" PRIMARY KEY)')
+        else:
+            cols = ", ".join(f'"{c}"' for c in self.key_columns)
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({cols}, PRIMARY KEY ({cols}))")
+        self._columns = self._table_columns()
+        self._conflict = ", ".join(f'"{c}"' for c in self.key_columns)
+        self._where = " AND ".join(f'"{c}" = ?' for c in self.key_columns)
+
+    def _table_columns(self):
+        return [r[1] for r in self.conn.execute(f"PRAGMA table_info({self.table})")]
+
+    def _add_columns(self, cols):
+        for col in cols:
+            if col not in self._columns:
+                self.conn.execute(f'ALTER TABLE {self.table} ADD COLUMN "{col}"')
+                self._columns.append(col)
+
+    def upsert_many(self, rows):
+        rows = [{k: _plain(v) for k, v in row.items()} for row in rows]
+        if not rows:
+            return
+        with self.conn:
+            self._add_columns([c for row in rows for c in row])
+            for cols in dict.fromkeys(tuple(row) for row in rows):
+                names = ", ".join(f'"{c}"' for c in cols)
+                marks = ", ".join("?" for _ in cols)
+                updates = ", ".join(f'"{c}"=excluded."{c}"' for c in cols if c not in self.key_columns)
+                sql = f"INSERT INTO {self.table} ({names}) VALUES ({marks}) ON CONFLICT({self._conflict}) DO "
+                sql += f"UPDATE SET {updates}" if updates else "NOTHING"
+                self.conn.executemany(sql, [tuple(row[c] for c in cols) for row in rows if tuple(row) == cols])
+
+    def read_all(self, columns=None):
+        names = "*"
+        if columns is not None:
+            wanted = set(columns) | set(_legacy_columns(columns)) | set(self.key_columns)
+            names = ", ".join(f'"{c}"' for c in self._columns if c in wanted)
+        df = pd.read_sql_query(f"SELECT {names} FROM {self.table} ORDER BY rowid", self.conn)
+        if "valid" in df.columns:
+            df["valid"] = df["valid"].map({1: True, 0: False})
+        return _upgrade_frame(df)
+
+    def get(self, seed):
+        cur = self.conn.execute(f"SELECT * FROM {self.table} WHERE {self._where}",
+                                tuple(_plain(v) for v in self._key_values(seed)))
+        values = cur.fetchone()
+        if values is None:
+            raise KeyError(seed)
+        row = dict(zip([d[0] for d in cur.description], values))
+        if row.get("valid") is not None:
+            row["valid"] = bool(row["valid"])
+        return _upgrade_row(row)
+
+    def seeds(self):
+        cur = self.conn.execute(f"SELECT {self._conflict} FROM {self.table} ORDER BY rowid")
+        if isinstance(self.key, str):
+            return [r[0] for r in cur]
+        return [tuple(r) for r in cur]
+
+    def __contains__(self, seed):
+        cur = self.conn.execute(f"SELECT 1 FROM {self.table} WHERE {self._where}",
+                                tuple(_plain(v) for v in self._key_values(seed)))
+        return cur.fetchone() is not None
+
+    def close(self):
+        self.conn.close()
+
+
+BACKENDS = {
+    ".csv": CsvParamStore,
+    ".db": SqliteParamStore,
+    ".sqlite": SqliteParamStore,
+    ".sqlite3": SqliteParamStore,
+}
+
+_stores = {}
+
+
+def store_class(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in BACKENDS:
+        raise ValueError(f"No parameter store backend for '{ext}' files: {path}")
+    return BACKENDS[ext]
+
+
+def open_store(path, key="seed"):
+    # One store per file per process, so repeated save/load calls share state.
+    # SQLite connections belong to the thread that opened them: other threads
+    # need their own store_class(path)(path, key).
+    path = os.path.abspath(path)
+    key = key if isinstance(key, str) else tuple(key)
+    if (path, key) not in _stores:
+        _stores[path, key] = store_class(path)(path, key)
+    return _stores[path, key]
+
+
+def migrate_csv(csv_path, dest_path, chunksize=100_000):
+    # One-shot copy of an existing data.csv (possibly with rewritten-in-place
+    # rows from the old save_params) into another store.
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file not found at: {csv_path}")
+    dest = open_store(dest_path)
+    n = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, float_precision="round_trip"):
+        chunk = _upgrade_frame(chunk)
+        chunk = chunk.astype(object).where(chunk.notnull(), None)
+        dest.upsert_many(chunk.to_dict("records"))
+        n += len(chunk)
+    print(f"Migrated {n} rows from {csv_path} to {dest_path}")
+    return dest
+
+
+def to_records(df):
+    # DataFrame with PARAM_COLUMNS -> structured array of PARAM_DTYPE
+    out = np.zeros(len(df), dtype=PARAM_DTYPE)
+    for col in PARAM_COLUMNS:
+        if col == "valid":
+            valid = df["valid"] if "valid" in df.columns else pd.Series(None, index=df.index, dtype=object)
+            out[col] = valid.map({True: 1, False: 0, 1: 1, 0: 0}).fillna(-1).astype(np.int8)
+        elif col in df.columns:
+            out[col] = df[col].to_numpy(dtype=PARAM_DTYPE[col])
+        else:
+            out[col] = np.nan
+    return out
+
+
+def from_records(arr):
+    df = pd.DataFrame({col: arr[col] for col in arr.dtype.names})
+    if "valid" in df.columns:
+        df["valid"] = df["valid"].map({1: True, 0: False, -1: None})
+    return df
+
+
+def export_npy(path, dest_path):
+    # Snapshot of a store as one structured .npy (PARAM_DTYPE), loadable with
+    # load_npy or np.load(..., mmap_mode="r") without any text parsing.
+    # Extra columns such as label_source are not part of the layout.
+    arr = to_records(open_store(path).read_all())
+    np.save(dest_path, arr)
+    print(f"Exported {len(arr)} rows from {path} to {dest_path}")
+    return arr
+
+
+def load_npy(path, mmap=True):
+    return from_records(np.load(path, mmap_mode="r" if mmap else None))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("usage: python param_store.py data.csv data.db")
+        print("       python param_store.py data.db data.npy")
+        sys.exit(1)
+    if sys.argv[2].endswith(".npy"):
+        export_npy(sys.argv[1], sys.argv[2])
+    else:
+        migrate_csv(sys.argv[1], sys.argv[2])
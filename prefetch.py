@@ -0,0 +1,138 @@
+# Renders upcoming seeds as low-res stills in background Blender processes
+# while the reviewer is still looking at the current one.
+#
+# Used from Human_in_the_middle_validation.py; no bpy needed here, the
+# workers are the same headless_render.py --serve processes render_farm uses.
+#
+# Stills are cached as seed_XXXXXXX_<param_hash>.png, with the hash of the
+# parameters batch_sampler gives that seed, so a still rendered from an older
+# parameter set is never shown. A slot whose Blender fails to start or dies
+# more than max_restarts times gives up; once all have, available() is False.
+import json
+import os
+import queue
+import threading
+
+from batch_sampler import sample_params
+from param_store import param_hash
+from render_farm import STARTUP_TIMEOUT, BlenderWorker
+
+
+class RenderPrefetcher:
+    def __init__(self, blender, blend_file, cache_dir, workers=2, res_percent=25, max_restarts=3,
+                 startup_timeout=STARTUP_TIMEOUT):
+        self.blender = blender
+        self.blend_file = blend_file
+        self.cache_dir = cache_dir
+        self.res_percent = res_percent
+        self.max_restarts = max_restarts
+        self.startup_timeout = startup_timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.todo = queue.Queue()
+        self.ready = {}
+        self.queued = set()
+        self.expected = {}  # seed -> param_hash of its parameters
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.workers = {}  # slot -> its current BlenderWorker, so close() can kill it
+        self.threads = [threading.Thread(target=self._run, args=(i,), daemon=True) for i in range(workers)]
+        for t in self.threads:
+            t.start()
+
+    def _image(self, seed):
+        return os.path.join(self.cache_dir, f"seed_{seed:07d}_{self.expected[seed]}.png")
+
+    def available(self):
+        return not self.stopped.is_set() and any(t.is_alive() for t in self.threads)
+
+    def request(self, seeds):
+        # Queue seeds in the given order, skipping ones already done or queued
+        with self.lock:
+            new = [s for s in seeds if s not in self.expected]
+        if new:
+            rows = sample_params(new).to_dict("records")
+            with self.lock:
+                self.expected.update((int(r["seed"]), param_hash(r)) for r in rows)
+        for seed in seeds:
+            with self.lock:
+                if seed in self.queued or seed in self.ready:
+                    continue
+                if os.path.exists(self._image(seed)):
+                    self.ready[seed] = self._image(seed)
+                    continue
+                self.queued.add(seed)
+            self.todo.put(seed)
+
+    def get(self, seed):
+        with self.lock:
+            return self.ready.get(seed)
+
+    def _done(self, seed, row):
+        # Keep the still under its parameter hash, if it shows what we expect
+        rendered = os.path.join(self.cache_dir, row["image"])
+        if param_hash(row) != self.expected[seed]:
+            print(f"Prefetch: seed {seed} rendered with different parameters, not used")
+            os.remove(rendered)
+            return
+        os.replace(rendered, self._image(seed))
+        self.ready[seed] = self._image(seed)
+
+    def _run(self, slot):
+        worker = None
+        restarts = 0
+        log_path = os.path.join(self.cache_dir, f"prefetch_{slot}.log")
+        while not self.stopped.is_set():
+            try:
+                seed = self.todo.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if seed is None:
+                break
+
+            if worker is None:
+                if restarts > self.max_restarts:
+                    print(f"Prefetch slot {slot}: giving up after {restarts} failed starts (see {log_path})")
+                    with self.lock:
+                        self.queued.discard(seed)
+                    break
+                worker = BlenderWorker(self.blender, self.blend_file, self.cache_dir, self.res_percent, log_path)
+                with self.lock:
+                    self.workers[slot] = worker
+                    stopped = self.stopped.is_set()
+                if stopped:
+                    worker.proc.kill()  # close() ran while this one was starting
+                if not worker.wait_ready(self.startup_timeout):
+                    worker = None
+                    restarts += 1
+                    with self.lock:
+                        self.queued.discard(seed)
+                    continue
+
+            worker.submit(seed)
+            kind, payload = worker.wait_for({"DONE", "FAIL"})
+            with self.lock:
+                self.queued.discard(seed)
+                if kind == "DONE":
+                    self._done(seed, json.loads(payload))
+            if kind == "EXIT":
+                worker.close()
+                worker = None
+                restarts += 1
+
+        if worker is not None:
+            worker.close()
+
+    def close(self, timeout=2):
+        # Called from the UI thread: renders in flight are not waited for.
+        # Killing the Blender processes ends the threads' waits, then the
+        # threads are joined briefly.
+        self.stopped.set()
+        for _ in self.threads:
+            self.todo.put(None)
+        with self.lock:
+            workers = list(self.workers.values())
+        for worker in workers:
+            worker.proc.kill()
+        for t in self.threads:
+            t.join(timeout)
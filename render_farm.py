@@ -0,0 +1,266 @@
+# Local render farm: shards a seed list across N background Blender
+# processes, each running headless_render.py --serve.
+#
+#   python render_farm.py --blender blender --blend scene.blend \
+#       --start 0 --stop 10000 --out renders/ --workers 8
+#
+# Workers pull seeds one at a time from a shared queue, so slow seeds do not
+# hold up a fixed shard. Only the dispatcher writes the manifest, so all
+# workers' results end up in one parameter store. A worker that dies has its
+# in-flight seed put back on the queue (up to --retries times per seed) and
+# is restarted.
+#
+# With --views M every worker renders M camera/light views per terrain seed
+# (see headless_render.py) and the manifest is keyed by (seed, view_id).
+import argparse
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from param_store import open_store
+from render_paths import default_manifest, image_path, manifest_key
+
+# Seconds a new Blender gets to load the .blend and report READY
+STARTUP_TIMEOUT = 120
+
+HEADLESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "headless_render.py")
+
+
+class BlenderWorker:
+    def __init__(self, blender, blend_file, out_dir, res_percent=100, log_path=None, views=1):
+        cmd = [
+            blender, blend_file, "--background", "--python", HEADLESS, "--",
+            "--serve", "--out", out_dir, "--res-percent", str(res_percent), "--views", str(views),
+        ]
+        self.log = open(log_path, "a") if log_path else subprocess.DEVNULL
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self.log,
+            text=True, bufsize=1,
+        )
+        self.messages = queue.Queue()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        # Blender prints its own progress on stdout; only "@@" lines are ours
+        for line in self.proc.stdout:
+            if line.startswith("@@"):
+                kind, _, payload = line[2:].rstrip("\n").partition(" ")
+                self.messages.put((kind, payload))
+            elif self.log is not subprocess.DEVNULL:
+                self.log.write(line)
+        self.messages.put(("EXIT", self.proc.wait()))
+
+    def submit(self, seed):
+        try:
+            self.proc.stdin.write(f"{seed}\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass  # the reader reports EXIT
+
+    def wait_for(self, kinds, timeout=None):
+        while True:
+            kind, payload = self.messages.get(timeout=timeout)
+            if kind in kinds or kind == "EXIT":
+                return kind, payload
+
+    def wait_ready(self, timeout=STARTUP_TIMEOUT):
+        # -> True once the worker reports READY; a worker that exits or hangs
+        # during startup (missing add-on, modal dialog, bad .blend) is closed
+        try:
+            kind, _ = self.wait_for({"READY"}, timeout=timeout)
+        except queue.Empty:
+            kind = "TIMEOUT"
+            self.proc.kill()
+        if kind != "READY":
+            self.close()
+            return False
+        return True
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        if self.log is not subprocess.DEVNULL:
+            self.log.close()
+
+
+class RenderFarm:
+    def __init__(self, blender, blend_file, out_dir, workers=None, manifest=None,
+                 res_percent=100, retries=2, max_restarts=5, seed_timeout=None, views=1,
+                 startup_timeout=STARTUP_TIMEOUT):
+        self.blender = blender
+        self.blend_file = blend_file
+        self.out_dir = out_dir
+        self.n_workers = workers or os.cpu_count()
+        self.views = views
+        self.store = open_store(manifest or default_manifest(out_dir, views), key=manifest_key(views))
+        self.res_percent = res_percent
+        self.retries = retries
+        self.max_restarts = max_restarts
+        self.seed_timeout = seed_timeout
+        self.startup_timeout = startup_timeout
+
+        self.work = queue.Queue()
+        self.results = queue.Queue()
+        self.attempts = {}
+        self.failed = {}
+        self.lock = threading.Lock()
+
+    def _start_worker(self, slot):
+        log_path = os.path.join(self.out_dir, f"worker_{slot}.log")
+        worker = BlenderWorker(self.blender, self.blend_file, self.out_dir, self.res_percent, log_path, self.views)
+        if not worker.wait_ready(self.startup_timeout):
+            print(f"Worker {slot}: Blender did not start (see {log_path})")
+            return None
+        return worker
+
+    def _requeue(self, seed, reason):
+        with self.lock:
+            self.attempts[seed] = self.attempts.get(seed, 0) + 1
+            retry = self.attempts[seed] <= self.retries
+            if not retry:
+                self.failed[seed] = reason
+        if retry:
+            self.work.put(seed)
+
+    def _run_slot(self, slot):
+        restarts = 0
+        worker = None
+        while True:
+            try:
+                seed = self.work.get_nowait()
+            except queue.Empty:
+                break
+
+            while worker is None:
+                if restarts > self.max_restarts:
+                    print(f"Worker {slot}: giving up after {restarts} failed starts")
+                    self.work.put(seed)
+                    return
+                worker = self._start_worker(slot)
+                if worker is None:
+                    restarts += 1
+
+            worker.submit(seed)
+            try:
+                kind, payload = worker.wait_for({"DONE", "FAIL"}, timeout=self.seed_timeout)
+            except queue.Empty:
+                kind, payload = "EXIT", "timeout"
+                worker.proc.kill()
+
+            if kind == "DONE":
+                # One row, or one row per view
+                self.results.put(json.loads(payload))
+            elif kind == "FAIL":
+                self._requeue(seed, payload)
+            else:
+                print(f"Worker {slot} died on seed {seed} ({payload}), restarting")
+                self._requeue(seed, f"worker exited: {payload}")
+                worker.close()
+                worker = None
+                restarts += 1
+
+        if worker is not None:
+            worker.close()
+
+    def pending(self, seeds, overwrite=False):
+        if overwrite:
+            return list(seeds)
+        return [s for s in seeds if not self._rendered(s)]
+
+    def _rendered(self, seed):
+        if self.views == 1:
+            return seed in self.store and os.path.exists(self._image(seed))
+        return all((seed, v) in self.store and os.path.exists(self._image(seed, v)) for v in range(self.views))
+
+    def _image(self, seed, view_id=None):
+        return image_path(self.out_dir, seed, view_id)
+
+    def run(self, seeds, overwrite=False):
+        os.makedirs(self.out_dir, exist_ok=True)
+        todo = self.pending(seeds, overwrite)
+        for seed in todo:
+            self.work.put(seed)
+        print(f"{len(todo)} seeds to render on {self.n_workers} workers")
+
+        t0 = time.perf_counter()
+        slots = [threading.Thread(target=self._run_slot, args=(i,), daemon=True) for i in range(self.n_workers)]
+        for t in slots:
+            t.start()
+
+        # Single writer: results from every worker go through this loop
+        done = 0
+        while any(t.is_alive() for t in slots) or not self.results.empty():
+            try:
+                batch = [self.results.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while not self.results.empty():
+                batch.append(self.results.get_nowait())
+            rows = []
+            for result in batch:
+                rows.extend(result if isinstance(result, list) else [result])
+            self.store.upsert_many(rows)
+            done += len(batch)
+
+        # Seeds left over when every slot gave up on restarting its worker
+        while not self.work.empty():
+            self.failed[self.work.get_nowait()] = "no worker left"
+
+        elapsed = time.perf_counter() - t0
+        rate = done / elapsed * 3600 if elapsed > 0 else 0.0
+        print(f"Rendered {done}/{len(todo)} seeds in {elapsed:.1f}s ({rate:.0f} seeds/hour), "
+              f"{len(self.failed)} failed")
+        return {"rendered": done, "failed": dict(self.failed), "seconds": elapsed, "seeds_per_hour": rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a seed range on several local Blender processes")
+    parser.add_argument("--blender", default="blender")
+    parser.add_argument("--blend", required=True, help=".blend file with the HexGrid scene")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--res-percent", type=int, default=100)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--seed-timeout", type=float, default=None, help="seconds before a stuck worker is killed")
+    parser.add_argument("--startup-timeout", type=float, default=STARTUP_TIMEOUT,
+                        help="seconds a worker gets to start before it counts as a failed start")
+    parser.add_argument("--views", type=int, default=1, help="camera/light views rendered per terrain seed")
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--min-coverage", type=float, default=None,
+                        help="skip seeds whose camera frame is mostly empty (see frustum_check.py)")
+    parser.add_argument("--grid-half-extent", type=float, nargs="+", default=None, metavar="HALF",
+                        help="terrain half width in X (and Y), needed with --min-coverage")
+    parser.add_argument("--clip-end", type=float, default=None, help="camera clip end for --min-coverage")
+    args = parser.parse_args()
+
+    seeds = range(args.start, args.stop)
+    if args.min_coverage is not None:
+        from frustum_check import coverage_filter
+        if args.grid_half_extent is None:
+            parser.error("--min-coverage needs --grid-half-extent")
+        seeds, _ = coverage_filter(seeds, args.min_coverage, args.grid_half_extent, clip_end=args.clip_end)
+
+    farm = RenderFarm(args.blender, args.blend, args.out, args.workers, args.manifest,
+                      args.res_percent, args.retries, seed_timeout=args.seed_timeout, views=args.views,
+                      startup_timeout=args.startup_timeout)
+    farm.run(seeds, args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# Where rendered stills and their manifests live, shared by headless_render.py
+# (inside Blender) and render_farm.py / prefetch.py (plain Python), so both
+# sides agree on names without importing bpy.
+import os
+
+# Store key for rows of multi-view renders (see HexGridParams.set_view)
+VIEW_KEY = ("seed", "view_id")
+
+
+def image_path(out_dir, seed, view_id=None):
+    if view_id is None:
+        return os.path.join(out_dir, f"seed_{seed:07d}.png")
+    return os.path.join(out_dir, f"seed_{seed:07d}_v{view_id:02d}.png")
+
+
+def default_manifest(out_dir, views=1):
+    return os.path.join(out_dir, "manifest.csv" if views == 1 else "manifest_views.csv")
+
+
+def manifest_key(views=1):
+    return "seed" if views == 1 else VIEW_KEY
@@ -0,0 +1,122 @@
+# Random-access index over the labelled seeds of a parameter store, for
+# review_validated.py.
+#
+#   index = ReviewIndex("data.csv", model_path="validity_model.pkl")
+#   index.set_filter("range", column="detail", low=4, high=8)
+#   index.index_of(123456)  # -> position of that seed in the current view
+#   index.row(i)            # -> parameter row at position i
+#
+# The valid rows are read once and re-read only when the store's stamp
+# changes, so labels written meanwhile (e.g. by Human_in_the_middle_validation)
+# show up on the next refresh() without re-reading an unchanged store.
+# Filters select a view of those rows:
+#   "all"     every valid seed, by seed
+#   "score"   classifier p(valid) of at least `low` (lowest first, so the
+#             doubtful ones come up first), needs model_path
+#   "range"   `column` between `low` and `high`, by seed
+#   "recent"  the `count` seeds first labelled last, newest first; the
+#             store keeps each seed where it was first labelled, so
+#             relabelling a seed does not bring it back up
+import numpy as np
+
+from param_store import open_store
+
+FILTERS = ("all", "score", "range", "recent")
+
+
+class ReviewIndex:
+    def __init__(self, path, model_path=None, valid=True):
+        self.path = path
+        self.model_path = model_path
+        self.valid = valid
+        self.stamp = None
+        self.rows = None    # labelled rows, in order of first label
+        self.seeds = np.empty(0, dtype=np.int64)
+        self.scores = None  # classifier scores of self.rows, computed on demand
+        self.order = np.empty(0, dtype=np.int64)  # positions into self.rows
+        self.positions = {}  # seed -> position in the current view
+        self.filter = ("all", {})
+
+    def refresh(self):
+        # Re-read the store if it changed -> True if it did
+        store = open_store(self.path)
+        stamp = store.stamp()
+        if stamp == self.stamp and self.rows is not None:
+            return False
+        df = store.read_all()
+        df = df[df["valid"] == self.valid].reset_index(drop=True)
+        self.rows = df
+        self.seeds = df["seed"].to_numpy(dtype=np.int64)
+        self.scores = None
+        self.stamp = stamp
+        self.set_filter(self.filter[0], **self.filter[1])
+        return True
+
+    def _score(self):
+        if self.scores is None:
+            from validity_model import predict
+            if self.model_path is None:
+                raise ValueError("The score filter needs a model_path")
+            self.scores = predict.load(self.model_path).predict_proba(self.rows)
+        return self.scores
+
+    def set_filter(self, kind="all", **options):
+        if kind not in FILTERS:
+            raise ValueError(f"Unknown filter '{kind}', expected one of {FILTERS}")
+        if self.rows is None:
+            self.refresh()
+        self.filter = (kind, options)
+        if kind == "recent":
+            count = options.get("count", 100)
+            return self._set_order(np.arange(len(self.rows))[::-1][:count])
+
+        if kind == "score":
+            values = self._score()
+        elif kind == "range":
+            values = self.rows[options["column"]].to_numpy(dtype=np.float64)
+        else:
+            values = None
+        keep = np.ones(len(self.rows), dtype=bool)
+        if values is not None:
+            keep &= values >= options.get("low", -np.inf)
+            keep &= values <= options.get("high", np.inf)
+        selected = np.flatnonzero(keep)
+        sort_by = values[selected] if kind == "score" else self.seeds[selected]
+        return self._set_order(selected[np.argsort(sort_by, kind="stable")])
+
+    def _set_order(self, order):
+        self.order = order
+        self.positions = dict(zip(self.seeds[order].tolist(), range(len(order))))
+        return len(order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def seed(self, i):
+        return int(self.seeds[self.order[i]])
+
+    def row(self, i):
+        return self.rows.iloc[self.order[i]].to_dict()
+
+    def column_range(self, column):
+        # -> (min, max) of a column over the labelled rows, for range filters
+        values = self.rows[column].to_numpy(dtype=np.float64) if self.rows is not None else []
+        if not len(values) or np.isnan(values).all():
+            return 0.0, 1.0
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    def index_of(self, seed):
+        # Position of `seed` in the current view, or None
+        return self.positions.get(int(seed))
+
+    def position(self, seed):
+        # Where to stay after the view changed: index_of(seed), or for a seed
+        # that left the view the position of the next larger seed (by-seed
+        # views) or None
+        i = self.index_of(seed)
+        if i is not None:
+            return i
+        if self.filter[0] in ("all", "range"):
+            i = int(np.searchsorted(self.seeds[self.order], seed))
+            return min(i, len(self.order) - 1) if len(self.order) else None
+        return None
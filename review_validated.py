@@ -1,36 +1,104 @@
 import sys
 sys.path.append(r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar")
 from hexgrid_params import *
+from geometry_cache import GeometryCache, show_terrain, terrain_key
+from review_index import FILTERS, ReviewIndex
+from validity_model.features import RAW_FEATURES
 
 CSV_PATH = r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar\data.csv"
+# Evaluated terrain of seeds already shown, so Previous/Next on them is instant
+CACHE_DIR = r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar\geometry_cache"
+CACHE_MAX_MB = 1024
+# Classifier for the "score" filter (None hides it)
+MODEL_PATH = None
+# Seeds on each side of the current one whose terrain is loaded ahead: cached
+# ones are read in the background, missing ones are evaluated into the cache
+# one per idle tick (every WARM_INTERVAL seconds) while the loop runs
+PREFETCH_NEIGHBOURS = 2
+WARM_INTERVAL = 0.05
 
 mod = bpy.data.objects["HexGridController"].modifiers["HexGrid"]
 node_group = bpy.data.node_groups['HexGridGroup']
 hg = HexGridParams(mod,node_group,0)
+probe = HexGridParams(mod,node_group,0)  # neighbours' params, never applied
+cache = GeometryCache(CACHE_DIR, max_bytes=CACHE_MAX_MB * 2**20)
 
-df = pd.read_csv(CSV_PATH)
-
-df_valid = df[df['valid'] == True]
-seed_valid = df_valid["seed"].astype(int).reset_index(drop=True).tolist()
+index = ReviewIndex(CSV_PATH, model_path=MODEL_PATH)
+index.refresh()
 
 # Global variables for loop control
 iteration = 0
 loop_running = False
 
+warm_queue = []  # neighbour rows whose terrain is not cached yet, nearest first
+
+def prefetch_neighbours():
+    global warm_queue
+    keys, missing = [], []
+    for step in range(1, PREFETCH_NEIGHBOURS + 1):
+        for i in (iteration + step, iteration - step):
+            if 0 <= i < len(index):
+                row = index.row(i)
+                probe.load_row(row, CSV_PATH)
+                key = terrain_key(probe)
+                keys.append(key)
+                if key not in cache:
+                    missing.append(row)
+    cache.prefetch(keys)
+    warm_queue = missing
+    if missing and not bpy.app.timers.is_registered(warm_neighbour):
+        bpy.app.timers.register(warm_neighbour, first_interval=WARM_INTERVAL)
+
+def warm_neighbour():
+    # Evaluates one missing neighbour into the cache, then puts the current
+    # seed back from the cache; both happen before the viewport redraws, so
+    # the neighbour is never shown
+    if not loop_running or not warm_queue:
+        return None
+    probe.load_row(warm_queue.pop(0), CSV_PATH)
+    key = terrain_key(probe)
+    if key not in cache:
+        show_terrain(probe, cache)
+        if key not in cache:
+            warm_queue.clear()  # the node tree's output cannot be cached
+        show_terrain(hg, cache)
+    return WARM_INTERVAL if warm_queue else None
+
+def refresh_index():
+    # Picks up labels written since the last look; stays on the same seed
+    global iteration
+    current = index.seed(iteration) if 0 <= iteration < len(index) else None
+    if index.refresh() and current is not None:
+        position = index.position(current)
+        iteration = position if position is not None else 0
+
 def run_loop():
     global iteration, loop_running
-    if not loop_running or iteration >= len(seed_valid) or iteration < 0:
+    refresh_index()
+    if not loop_running or iteration >= len(index) or iteration < 0:
         running = False
         print("Seed loop stopped.")
         return None
 
-    hg.load_params(seed_valid[iteration],CSV_PATH)
-    hg.update()
+    hg.load_row(index.row(iteration), CSV_PATH)
+    hit = show_terrain(hg, cache)
     bpy.data.objects['Plane'].location[2] = hg.instance_scale
-    
-    print(f"Iteration: {iteration}\nSeed: {seed_valid[iteration]}")
-    
-    return None 
+    prefetch_neighbours()
+
+    print(f"Iteration: {iteration}/{len(index)}\nSeed: {hg.seed}{' (cached)' if hit else ''}")
+
+    return None
+
+def filter_options(scene):
+    kind = scene.hexgrid_filter
+    if kind == "score":
+        return {"low": scene.hexgrid_filter_low}
+    if kind == "range":
+        return {"column": scene.hexgrid_filter_column, "low": scene.hexgrid_filter_low,
+                "high": scene.hexgrid_filter_high}
+    if kind == "recent":
+        return {"count": scene.hexgrid_recent_count}
+    return {}
 
 # Panel UI to start/stop the loop
 class HEXGRID_PT_panel(bpy.types.Panel):
@@ -45,16 +113,38 @@ class HEXGRID_PT_panel(bpy.types.Panel):
         scene = context.scene
 
 #        layout.prop(scene, "hexgrid_csv_path")
+        box = layout.box()
+        box.prop(scene, "hexgrid_filter", text="Show")
+        if scene.hexgrid_filter == "range":
+            box.prop(scene, "hexgrid_filter_column", text="Column")
+            row = box.row(align=True)
+            row.prop(scene, "hexgrid_filter_low", text="Min")
+            row.prop(scene, "hexgrid_filter_high", text="Max")
+        elif scene.hexgrid_filter == "score":
+            box.prop(scene, "hexgrid_filter_low", text="Min score")
+        elif scene.hexgrid_filter == "recent":
+            box.prop(scene, "hexgrid_recent_count", text="Count")
+        row = box.row()
+        row.operator("hexgrid.apply_filter", text="Apply Filter", icon='FILTER')
+        row.label(text=f"{len(index)} seeds")
+
         row = layout.row()
         if loop_running:
             row.operator("hexgrid.stop_loop", text="Stop Loop", icon='PAUSE')
-            
+
             layout.separator()
-            layout.label(text="View iteration:")
+            layout.label(text=f"View iteration: {iteration}/{len(index)}")
             nav_row = layout.row()
-            
+
             nav_row.operator("hexgrid.previous", text="Previous", icon='EVENT_LEFT_ARROW')
             nav_row.operator("hexgrid.next", text="Next", icon='EVENT_RIGHT_ARROW')
+
+            jump_row = layout.row(align=True)
+            jump_row.prop(scene, "hexgrid_jump_seed", text="Seed")
+            jump_row.operator("hexgrid.jump_seed", text="Go")
+            jump_row = layout.row(align=True)
+            jump_row.prop(scene, "hexgrid_jump_index", text="Index")
+            jump_row.operator("hexgrid.jump_index", text="Go")
         else:
             row.operator("hexgrid.start_loop", text="Start Loop", icon='PLAY')
 
@@ -70,7 +160,7 @@ class HEXGRID_OT_start_loop(bpy.types.Operator):
             bpy.app.timers.register(run_loop)
             print("Started loop")
         return {'FINISHED'}
-    
+
 class HEXGRID_OT_next(bpy.types.Operator):
     bl_idname = "hexgrid.next"
     bl_label = "Next"
@@ -82,7 +172,7 @@ class HEXGRID_OT_next(bpy.types.Operator):
             iteration += 1
             bpy.app.timers.register(run_loop)
         return {'FINISHED'}
-    
+
 class HEXGRID_OT_previous(bpy.types.Operator):
     bl_idname = "hexgrid.previous"
     bl_label = "Previous"
@@ -95,6 +185,54 @@ class HEXGRID_OT_previous(bpy.types.Operator):
             bpy.app.timers.register(run_loop)
         return {'FINISHED'}
 
+class HEXGRID_OT_jump_seed(bpy.types.Operator):
+    bl_idname = "hexgrid.jump_seed"
+    bl_label = "Jump to Seed"
+
+    def execute(self, context):
+        global iteration
+        refresh_index()
+        position = index.index_of(context.scene.hexgrid_jump_seed)
+        if position is None:
+            self.report({'WARNING'}, f"Seed {context.scene.hexgrid_jump_seed} is not in the current filter")
+            return {'CANCELLED'}
+        iteration = position
+        bpy.app.timers.register(run_loop)
+        return {'FINISHED'}
+
+class HEXGRID_OT_jump_index(bpy.types.Operator):
+    bl_idname = "hexgrid.jump_index"
+    bl_label = "Jump to Index"
+
+    def execute(self, context):
+        global iteration
+        refresh_index()
+        if not len(index):
+            self.report({'WARNING'}, "No seeds match the current filter")
+            return {'CANCELLED'}
+        iteration = min(max(context.scene.hexgrid_jump_index, 0), len(index) - 1)
+        bpy.app.timers.register(run_loop)
+        return {'FINISHED'}
+
+class HEXGRID_OT_apply_filter(bpy.types.Operator):
+    bl_idname = "hexgrid.apply_filter"
+    bl_label = "Apply Filter"
+
+    def execute(self, context):
+        global iteration
+        current = index.seed(iteration) if 0 <= iteration < len(index) else None
+        try:
+            index.set_filter(context.scene.hexgrid_filter, **filter_options(context.scene))
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        position = index.position(current) if current is not None else None
+        iteration = position if position is not None else 0
+        print(f"{len(index)} seeds match the filter")
+        if loop_running:
+            bpy.app.timers.register(run_loop)
+        return {'FINISHED'}
+
 class HEXGRID_OT_stop_loop(bpy.types.Operator):
     bl_idname = "hexgrid.stop_loop"
     bl_label = "Stop HexGrid Loop"
@@ -106,7 +244,28 @@ class HEXGRID_OT_stop_loop(bpy.types.Operator):
         return {'FINISHED'}
 
 
-classes = [HEXGRID_PT_panel, HEXGRID_OT_start_loop, HEXGRID_OT_stop_loop, HEXGRID_OT_next, HEXGRID_OT_previous]
+classes = [HEXGRID_PT_panel, HEXGRID_OT_start_loop, HEXGRID_OT_stop_loop, HEXGRID_OT_next, HEXGRID_OT_previous,
+           HEXGRID_OT_jump_seed, HEXGRID_OT_jump_index, HEXGRID_OT_apply_filter]
+
+def reset_filter_bounds(self, context):
+    # Min/Max start at the bounds of the chosen column (0..1 for scores)
+    if self.hexgrid_filter == "range":
+        self.hexgrid_filter_low, self.hexgrid_filter_high = index.column_range(self.hexgrid_filter_column)
+    elif self.hexgrid_filter == "score":
+        self.hexgrid_filter_low, self.hexgrid_filter_high = 0.0, 1.0
+
+filters = [f for f in FILTERS if f != "score" or MODEL_PATH is not None]
+scene_props = {
+    "hexgrid_filter": bpy.props.EnumProperty(items=[(f, f.capitalize(), "") for f in filters], default="all",
+                                             update=reset_filter_bounds),
+    "hexgrid_filter_column": bpy.props.EnumProperty(items=[(c, c, "") for c in RAW_FEATURES],
+                                                    update=reset_filter_bounds),
+    "hexgrid_filter_low": bpy.props.FloatProperty(default=0.0),
+    "hexgrid_filter_high": bpy.props.FloatProperty(default=1.0),
+    "hexgrid_recent_count": bpy.props.IntProperty(default=100, min=1),
+    "hexgrid_jump_seed": bpy.props.IntProperty(min=0),
+    "hexgrid_jump_index": bpy.props.IntProperty(min=0),
+}
 
 def unregister():
     for cls in reversed(classes):
@@ -114,11 +273,16 @@ def unregister():
             bpy.utils.unregister_class(cls)
         except RuntimeError:
             pass  # class not registered
+    for name in scene_props:
+        if hasattr(bpy.types.Scene, name):
+            delattr(bpy.types.Scene, name)
 
 def register():
     unregister()
+    for name, prop in scene_props.items():
+        setattr(bpy.types.Scene, name, prop)
     for cls in classes:
         bpy.utils.register_class(cls)
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
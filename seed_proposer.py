@@ -0,0 +1,234 @@
+# Seed proposals concentrated where labelled seeds tend to be valid, so more
+# of the review and render time goes to valid samples.
+#
+#   python seed_proposer.py --data data.csv --pool 0 1000000 --count 200 --target-yield 0.5
+#
+# Parameters stay a function of the seed (set_params), so proposing means
+# picking seeds: candidates from the pool are sampled with batch_sampler,
+# scored with an estimate p(valid | params) and kept by rejection sampling
+# with acceptance min(1, p / c). c is set so the expected valid rate of the
+# kept seeds reaches target_yield. A fraction `explore` of the proposals is
+# drawn uniformly from the pool instead so the estimate keeps seeing the
+# rest of parameter space; those are spread evenly through the list, so a
+# session that stops early still reviewed its share of them.
+#
+# Estimators:
+#   "histogram"   per-parameter histograms of valid vs all labelled rows
+#                 (independent ratios, Laplace-smoothed); needs no model.
+#                 With fewer than MIN_LABELS labels it gives every seed the
+#                 same p and all proposals are uniform ("explore")
+#   "classifier"  a saved validity_model artifact
+#
+# Every proposal carries its provenance (proposer, proposal_p) into the
+# parameter store through HexGridParams.provenance, and proposal_yield
+# reports the valid rate each proposer actually achieved. The "explore"
+# proposals are a uniform control group for that comparison.
+import numpy as np
+import pandas as pd
+
+from batch_sampler import sample_params
+from frustum_check import coverage_filter
+from param_store import open_store
+from validity_model.features import RAW_FEATURES
+
+PROPOSERS = ("histogram", "classifier")
+EXPLORE_LABEL = "explore"
+MIN_LABELS = 20
+
+
+class HistogramModel:
+    def __init__(self, columns=RAW_FEATURES, bins=20, alpha=1.0, min_labels=MIN_LABELS):
+        self.columns = list(columns)
+        self.bins = bins
+        self.alpha = alpha
+        self.min_labels = min_labels
+
+    def fit(self, df):
+        y = df["valid"].astype(bool).to_numpy()
+        self.prior = float(y.mean()) if len(y) else 0.5
+        self.edges = {}
+        self.log_ratio = {}
+        self.uniform = len(y) < self.min_labels
+        if self.uniform:
+            print(f"Histogram proposer: {len(y)} labels (< {self.min_labels}), proposing uniformly")
+            return self
+        for col in self.columns:
+            x = df[col].to_numpy(dtype=np.float64)
+            edges = np.linspace(x.min(), x.max(), self.bins + 1)
+            idx = self._bin(x, edges)
+            valid = np.bincount(idx[y], minlength=self.bins) + self.alpha
+            total = np.bincount(idx, minlength=self.bins) + self.alpha
+            # p(x_j | valid) / p(x_j)
+            self.log_ratio[col] = np.log(valid / valid.sum()) - np.log(total / total.sum())
+            self.edges[col] = edges
+        return self
+
+    def _bin(self, x, edges):
+        return np.clip(np.searchsorted(edges, x, side="right") - 1, 0, self.bins - 1)
+
+    def predict_proba(self, df):
+        log_p = np.full(len(df), np.log(max(self.prior, 1e-9)))
+        for col, log_ratio in self.log_ratio.items():
+            log_p += log_ratio[self._bin(df[col].to_numpy(dtype=np.float64), self.edges[col])]
+        return np.clip(np.exp(log_p), 0.0, 1.0)
+
+
+def labelled_rows(path):
+    # Human labels only, like the classifier's training data
+    df = open_store(path).read_all(columns=RAW_FEATURES + ["seed", "valid", "label_source"])
+    df = df[df["valid"].notnull()]
+    if "label_source" in df.columns:
+        df = df[df["label_source"].isnull()]
+    return df
+
+
+def load_proposer(kind, data_path=None, model_path=None):
+    if kind not in PROPOSERS:
+        raise ValueError(f"Unknown proposer '{kind}', expected one of {PROPOSERS}")
+    if kind == "classifier":
+        from validity_model import predict
+        return predict.load(model_path)
+    return HistogramModel().fit(labelled_rows(data_path))
+
+
+def acceptance_scale(p, target_yield):
+    # Smallest c with sum(a * p) / sum(a) >= target_yield for a = min(1, p / c);
+    # larger c keeps fewer, likelier seeds
+    lo, hi = 1e-9, max(float(p.max()), 1e-9)
+    if np.mean(p) >= target_yield:
+        return lo
+    for _ in range(50):
+        c = 0.5 * (lo + hi)
+        a = np.minimum(1.0, p / c)
+        if (a * p).sum() / max(a.sum(), 1e-12) >= target_yield:
+            hi = c
+        else:
+            lo = c
+    return hi
+
+
+def propose(model, pool, count, target_yield=0.5, explore=0.1, exclude=(), chunksize=20_000,
+            random_state=0, min_coverage=None, grid_half_extent=None, clip_end=None):
+    # -> DataFrame of `count` proposed parameter rows with provenance columns
+    name = "classifier" if not isinstance(model, HistogramModel) else "histogram"
+    if getattr(model, "uniform", False):
+        name = EXPLORE_LABEL
+    rng = np.random.default_rng(random_state)
+    exclude = set(exclude)
+    pool = np.array([s for s in pool if s not in exclude], dtype=np.int64)
+    rng.shuffle(pool)
+
+    def covered(df):
+        if min_coverage is None:
+            return df
+        keep, _ = coverage_filter(df["seed"], min_coverage, grid_half_extent, params=df, clip_end=clip_end)
+        return df[df["seed"].isin(keep)]
+
+    # Exploration goes through the coverage filter too; seeds are drawn until
+    # n_explore pass, scaled up by the pass rate seen so far
+    n_explore = int(round(count * explore))
+    explored, used, found = [], 0, 0
+    while found < n_explore and used < len(pool):
+        take = n_explore - found
+        if used:
+            take = int(np.ceil(take * used / max(found, 1)))
+        df = covered(sample_params(np.sort(pool[used:used + take])))
+        used += take
+        if len(df) > n_explore - found:
+            df = df.iloc[np.sort(rng.permutation(len(df))[:n_explore - found])]
+        explored.append(df)
+        found += len(df)
+    explored = pd.concat(explored, ignore_index=True) if explored else sample_params(pool[:0])
+    explored = explored.sort_values("seed", ignore_index=True)
+    explored = explored.assign(proposal_p=model.predict_proba(explored), proposer=EXPLORE_LABEL)
+    pool = pool[used:]
+    out = []
+
+    needed = count - len(explored)
+    c = base_rate = None
+    for start in range(0, len(pool), chunksize):
+        if needed <= 0:
+            break
+        df = covered(sample_params(np.sort(pool[start:start + chunksize])))
+        if not len(df):
+            continue
+        p = model.predict_proba(df)
+        if c is None:
+            c = acceptance_scale(p, target_yield)
+            base_rate = float(np.mean(p))
+        keep = rng.random(len(df)) < np.minimum(1.0, p / c)
+        kept = df[keep].assign(proposal_p=p[keep], proposer=name)
+        # The chunk is sorted by seed; a random subset, not the lowest seeds
+        kept = kept.iloc[np.sort(rng.permutation(len(kept))[:needed])]
+        out.append(kept)
+        needed -= len(kept)
+
+    proposals = interleave(explored, pd.concat(out, ignore_index=True) if out else explored.iloc[:0])
+    if base_rate is not None:
+        rate = proposals.loc[proposals["proposer"] == name, "proposal_p"].mean()
+        print(f"Proposed {len(proposals)} seeds ({len(explored)} exploration), "
+              f"expected valid rate {rate:.2f} vs {base_rate:.2f} unfiltered")
+    return proposals
+
+
+def interleave(explored, exploited):
+    # Both lists spread evenly over the result, keeping their own order
+    position = np.concatenate([(np.arange(len(explored)) + 0.5) / max(len(explored), 1),
+                               (np.arange(len(exploited)) + 0.5) / max(len(exploited), 1)])
+    both = pd.concat([explored, exploited], ignore_index=True)
+    return both.iloc[np.argsort(position, kind="stable")].reset_index(drop=True)
+
+
+def provenance(proposals):
+    # {seed: {"proposer": ..., "proposal_p": ...}} for HexGridParams.provenance
+    cols = ["proposer", "proposal_p"]
+    return {int(s): dict(zip(cols, v)) for s, *v in proposals[["seed"] + cols].itertuples(index=False)}
+
+
+def proposal_yield(path):
+    # Valid rate per proposer among reviewed proposals; with render_time or
+    # review_time recorded, valid samples per hour as well
+    df = open_store(path).read_all()
+    if "proposer" not in df.columns:
+        return pd.DataFrame()
+    df = df[df["valid"].notnull() & df["proposer"].notnull()]
+    if "label_source" in df.columns:
+        df = df[df["label_source"].isnull()]
+    grouped = df.groupby("proposer")
+    report = pd.DataFrame({
+        "reviewed": grouped.size(),
+        "valid_rate": grouped["valid"].apply(lambda v: v.astype(bool).mean()),
+        "expected_rate": grouped["proposal_p"].mean(),
+    })
+    for col in ("review_time", "render_time"):
+        if col in df.columns:
+            hours = grouped[col].sum() / 3600
+            report["valid_per_hour"] = grouped["valid"].apply(lambda v: v.astype(bool).sum()) / hours
+            break
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Propose seeds likely to be valid")
+    parser.add_argument("--data", required=True, help="labelled parameter store")
+    parser.add_argument("--proposer", choices=PROPOSERS, default="histogram")
+    parser.add_argument("--model", default=None, help="validity_model artifact for --proposer classifier")
+    parser.add_argument("--pool", type=int, nargs=2, default=(0, 1_000_000), metavar=("START", "STOP"))
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--target-yield", type=float, default=0.5)
+    parser.add_argument("--explore", type=float, default=0.1)
+    parser.add_argument("--out", default=None, help="write the proposals to this .csv")
+    parser.add_argument("--report", action="store_true", help="only print the achieved yield per proposer")
+    args = parser.parse_args()
+
+    if args.report:
+        print(proposal_yield(args.data).to_string())
+    else:
+        store = open_store(args.data)
+        model = load_proposer(args.proposer, args.data, args.model)
+        proposals = propose(model, range(*args.pool), args.count, args.target_yield, args.explore,
+                            exclude=store.seeds())
+        if args.out:
+            proposals.to_csv(args.out, index=False)
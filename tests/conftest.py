@@ -0,0 +1,11 @@
+# The tests run on plain CPython: bpy and mathutils are replaced by the
+# stand-ins in benchmarks/fake_bpy.py before any repo module is imported.
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import fake_bpy
+
+fake_bpy.install()
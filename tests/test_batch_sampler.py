@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import fake_bpy
+from batch_sampler import sample_params
+from hexgrid_params import HexGridParams
+from param_store import PARAM_COLUMNS
+
+# 23 makes standard_normal reject its first draw; 2**40 + 7 seeds with two words
+SEEDS = list(range(200)) + [123_456, 999_999, 2**31 - 1, 2**40 + 7]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matches_set_params_bit_for_bit(workers):
+    mod, node_group = fake_bpy.hexgrid()
+    df = sample_params(SEEDS, workers=workers, chunksize=64)
+    for seed, sampled in zip(SEEDS, df.to_dict("records")):
+        hg = HexGridParams(mod, node_group, seed)
+        hg.set_params()
+        expected = hg.to_row(valid=None)
+        for col in PARAM_COLUMNS:
+            if col == "valid":
+                assert sampled[col] is None
+            else:
+                # Same float64 bits, not just close
+                assert np.float64(sampled[col]).tobytes() == np.float64(expected[col]).tobytes(), (seed, col)
+
+
+def test_empty():
+    assert len(sample_params([])) == 0
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+import fake_bpy
+from camera_math import camera_poses
+from helper_functions import camera_move_and_cull
+
+
+@pytest.mark.parametrize("resolution", [(1920, 1080), (1080, 1920)])
+def test_single_pose_matches_camera_poses(resolution):
+    bpy = fake_bpy.install()
+    cam, cont = bpy.data.objects["Camera"], bpy.data.objects["Camera_culler"]
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        r, phi, theta = 200, rng.uniform(0, 2 * np.pi), rng.uniform(np.pi / 9, np.pi / 3)
+        target = tuple(rng.uniform(-5, 5, 3))
+        camera_move_and_cull(cam, cont, r, phi, theta, target, .2, resolution)
+        location, rotation, scale = camera_poses(r, phi, theta, cam.data.ortho_scale, target, .2, resolution)
+        np.testing.assert_allclose(cam.location, location, atol=1e-9)
+        np.testing.assert_allclose(cam.rotation_euler, rotation, atol=1e-9)
+        np.testing.assert_allclose(cont.scale, scale, rtol=1e-12)
+        assert cont.rotation_euler == cam.rotation_euler
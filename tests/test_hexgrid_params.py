@@ -0,0 +1,86 @@
+import pytest
+
+import fake_bpy
+from hexgrid_params import HexGridParams, reset_applied_state
+
+GROUPS = ["terrain", "ramp", "light", "camera", "culler"]
+
+
+@pytest.fixture
+def hg():
+    reset_applied_state()
+    mod, node_group = fake_bpy.hexgrid()
+    mod.clear()
+    mod.show_viewport = True
+    hg = HexGridParams(mod, node_group, 11)
+    hg.set_params()
+    yield hg
+    reset_applied_state()
+
+
+def test_first_update_applies_everything(hg):
+    assert hg.update() == GROUPS
+    assert hg.update() == []
+    assert hg.mod["Socket_5"] == hg.detail  # "Detail"
+
+
+def test_camera_change_moves_the_culler_too(hg):
+    hg.update()
+    hg.mod["Socket_5"] = "untouched"
+    hg.camera_azimuth += 0.5
+    assert hg.update() == ["camera", "culler"]
+    assert hg.mod["Socket_5"] == "untouched"
+
+
+def test_cull_false_holds_the_culler(hg):
+    hg.update()
+    culler = fake_bpy.install().data.objects["Camera_culler"]
+    held = culler.rotation_euler
+    hg.camera_azimuth += 0.5
+    assert hg.update(cull=False) == ["camera"]
+    assert culler.rotation_euler == held
+    assert hg.update() == ["culler"]
+    assert culler.rotation_euler != held
+
+
+def test_light_only_change(hg):
+    hg.update()
+    hg.light_altitude += 0.1
+    assert hg.update() == ["light"]
+
+
+def test_terrain_change_writes_only_changed_inputs(hg):
+    hg.update()
+    hg.mod["Socket_6"] = "untouched"  # "Roughness"
+    hg.detail += 1
+    assert hg.update() == ["terrain"]
+    assert hg.mod["Socket_5"] == hg.detail
+    assert hg.mod["Socket_6"] == "untouched"
+
+
+def test_new_seed_and_force(hg):
+    hg.update()
+    other = HexGridParams(hg.mod, hg.node_group, 12)
+    other.set_params()
+    assert other.update() == GROUPS
+    assert other.update(force=True) == GROUPS
+
+
+def test_terrain_false_defers_the_terrain(hg):
+    hg.update()
+    hg.detail += 1
+    hg.camera_scale += 1
+    assert hg.update(terrain=False) == ["camera", "culler"]
+    assert hg.mod["Socket_5"] != hg.detail
+    assert hg.update() == ["terrain"]
+    assert hg.mod["Socket_5"] == hg.detail
+
+
+def test_reloaded_params_are_not_dirty(hg, tmp_path):
+    # A CSV round trip gives back the exact values, so nothing re-evaluates
+    path = str(tmp_path / "data.csv")
+    hg.save_params(path, valid=True)
+    hg.update()
+    loaded = HexGridParams(hg.mod, hg.node_group, 0)
+    loaded.load_params(11, path)
+    assert loaded.update() == []
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("imblearn")
+
+from batch_sampler import sample_params
+from param_store import open_store
+from validity_model import incremental, xgb_backend
+from validity_model.train import train
+
+
+def labelled(seeds, threshold):
+    df = sample_params(seeds)
+    df["valid"] = df["scale"] > threshold
+    return df.astype(object).where(df.notnull(), None).to_dict("records")
+
+
+@pytest.fixture
+def trained(tmp_path):
+    data, model = str(tmp_path / "data.db"), str(tmp_path / "model.pkl")
+    threshold = sample_params(range(300))["scale"].median()
+    open_store(data).upsert_many(labelled(range(300), threshold))
+    train(data, "xgboost", model, plots=False)
+    return data, model, threshold
+
+
+def test_xgb_update_with_one_class():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] > 0).astype(int)
+    clf, _ = xgb_backend.train(X, y, n_estimators=10)
+    raw = bytes(clf.get_booster().save_raw("ubj"))
+    updated = xgb_backend.update(raw, X[y == 1][:5], y[y == 1][:5], rounds=3)
+    assert updated.get_booster().num_boosted_rounds() == 13
+    assert updated.predict_proba(X).shape == (200, 2)
+
+
+def test_single_class_increment(trained, monkeypatch):
+    data, model, threshold = trained
+    monkeypatch.setattr(incremental, "check_drift", lambda *args: None)
+    rows = [row for row in labelled(range(300, 400), threshold) if row["valid"]][:5]
+    open_store(data).upsert_many(rows)
+    artifact = incremental.update(model, data)
+    assert artifact["updates"] == 1
+    assert len(artifact["trained_seeds"]) == len(artifact["trained_labels"]) == 305
+
+
+def test_relabelled_seed_forces_refit(trained):
+    data, model, threshold = trained
+    row = labelled([0], threshold)[0]
+    open_store(data).upsert(dict(row, valid=not row["valid"]))
+    artifact = incremental.update(model, data)
+    assert artifact["updates"] == 0
+    assert artifact["trained_labels"][artifact["trained_seeds"] == 0].tolist() == [int(not row["valid"])]
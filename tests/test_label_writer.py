@@ -0,0 +1,98 @@
+import json
+import os
+import time
+
+import label_writer
+from label_writer import LabelWriter, open_writer, release_writer
+from param_store import store_class
+
+
+def read_seeds(path):
+    store = store_class(path)(path)
+    try:
+        return store.read_all().set_index("seed")["valid"].astype(bool).to_dict()
+    finally:
+        store.close()
+
+
+def test_writes_and_empties_journal(tmp_path):
+    path = str(tmp_path / "data.csv")
+    writer = LabelWriter(path, batch_size=2, flush_interval=60)
+    writer.put({"seed": 1, "valid": True})
+    writer.put_many([{"seed": 2, "valid": False}, {"seed": 1, "valid": False}])
+    assert writer.flush(timeout=10)
+    assert writer.pending() == 0
+    writer.close()
+    assert read_seeds(path) == {1: False, 2: False}
+    assert os.path.getsize(path + ".journal") == 0
+
+
+def test_replays_journal_with_torn_last_line(tmp_path):
+    # A session that died mid-write: two whole rows and half of a third
+    path = str(tmp_path / "data.csv")
+    with open(path + ".journal", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"seed": 4, "valid": True}) + "\n")
+        f.write(json.dumps({"seed": 5, "valid": False}) + "\n")
+        f.write('{"seed": 6, "va')
+
+    writer = LabelWriter(path)
+    writer.put({"seed": 7, "valid": True})  # appended after the torn line, not onto it
+    assert writer.flush(timeout=10)
+    writer.close()
+    assert read_seeds(path) == {4: True, 5: False, 7: True}
+    assert os.path.getsize(path + ".journal") == 0
+
+
+def test_unflushed_rows_survive_in_journal(tmp_path):
+    path = str(tmp_path / "data.db")
+    writer = LabelWriter(path, batch_size=1000, flush_interval=60)
+    writer.put({"seed": 8, "valid": True})
+    # Blender dying now: the row is only in the journal
+    writer.journal.close()
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert [json.loads(line)["seed"] for line in f] == [8]
+
+    replay = LabelWriter(path)
+    assert replay.flush(timeout=10)
+    replay.close()
+    assert read_seeds(path) == {8: True}
+
+
+def test_open_writer_is_shared_until_last_release(tmp_path):
+    path = str(tmp_path / "data.csv")
+    first = open_writer(path)
+    second = open_writer(os.path.relpath(path))
+    assert first is second
+    release_writer(first)
+    assert second.thread.is_alive()
+    second.put({"seed": 9, "valid": True})
+    release_writer(second)
+    assert not second.thread.is_alive()
+    assert read_seeds(path) == {9: True}
+    third = open_writer(path)
+    assert third is not first
+    release_writer(third)
+
+
+def test_flush_times_out_while_writes_fail(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.csv")
+    writer = LabelWriter(path, flush_interval=60)
+    monkeypatch.setattr(writer, "_write", lambda store, rows: False)
+    writer.put({"seed": 10, "valid": True})
+    t0 = time.monotonic()
+    assert not writer.flush(timeout=0.3)
+    assert time.monotonic() - t0 < 5
+    assert writer.pending() == 1
+    writer.close()
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert [json.loads(line)["seed"] for line in f] == [10]
+
+
+def test_flush_returns_when_the_thread_is_gone(tmp_path):
+    writer = LabelWriter(str(tmp_path / "data.csv"))
+    writer.todo.put(label_writer._STOP)
+    writer.thread.join()
+    writer.put({"seed": 11, "valid": True})
+    assert not writer.flush()
+    assert writer.pending() == 1
+    writer.close()
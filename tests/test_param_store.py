@@ -0,0 +1,88 @@
+import csv
+
+import pytest
+
+from batch_sampler import sample_params
+from param_store import PARAM_COLUMNS, open_store, store_class
+
+
+def rows(seeds, valid=True):
+    df = sample_params(seeds).assign(valid=valid)
+    return df.astype(object).where(df.notnull(), None).to_dict("records")
+
+
+@pytest.fixture(params=[".csv", ".db"])
+def path(request, tmp_path):
+    return str(tmp_path / f"data{request.param}")
+
+
+def test_round_trip(path):
+    store = store_class(path)(path)
+    written = rows([5, 3, 9])
+    store.upsert_many(written)
+    store.close()
+
+    store = store_class(path)(path)
+    assert sorted(store.seeds()) == [3, 5, 9]
+    assert 3 in store and 4 not in store
+    for row in written:
+        got = store.get(row["seed"])
+        for col in PARAM_COLUMNS:
+            assert got[col] == row[col], col
+    df = store.read_all()
+    assert df["seed"].tolist() == [5, 3, 9]
+    assert df["valid"].astype(bool).all()
+    store.close()
+
+
+def test_relabel_keeps_first_seen_order(path):
+    store = store_class(path)(path)
+    store.upsert_many(rows([5, 3, 9]))
+    store.upsert(rows([3], valid=False)[0])
+    df = store.read_all()
+    assert df["seed"].tolist() == [5, 3, 9]
+    assert df.set_index("seed")["valid"].astype(bool).to_dict() == {5: True, 3: False, 9: True}
+    assert not store.get(3)["valid"]
+    store.close()
+
+
+def test_composite_key(path):
+    store = store_class(path)(path, key=("seed", "view_id"))
+    store.upsert_many([dict(row, view_id=v) for row in rows([1, 2]) for v in range(2)])
+    store.upsert(dict(rows([1], valid=False)[0], view_id=1))
+    assert (1, 1) in store and (2, 1) in store and (1, 2) not in store
+    assert not store.get((1, 1))["valid"]
+    assert store.get((1, 0))["valid"]
+    store.close()
+
+
+def test_open_store_is_shared(tmp_path):
+    path = str(tmp_path / "data.csv")
+    assert open_store(path) is open_store(path)
+
+
+def test_legacy_camera_target_upgrade(tmp_path):
+    # Files written before the camera target was split into columns
+    path = str(tmp_path / "legacy.csv")
+    row = rows([7])[0]
+    legacy = {k: v for k, v in row.items() if not k.startswith("camera_target_")}
+    legacy["camera_target"] = "<Vector (1.0000, -2.5000, 0.0000)>"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(legacy))
+        writer.writeheader()
+        writer.writerow(legacy)
+
+    store = store_class(path)(path)
+    got = store.get(7)
+    assert "camera_target" not in got
+    assert (got["camera_target_x"], got["camera_target_y"], got["camera_target_z"]) == (1.0, -2.5, 0.0)
+    df = store.read_all()
+    assert "camera_target" not in df.columns
+    assert df[["camera_target_x", "camera_target_y", "camera_target_z"]].to_numpy().tolist() == [[1.0, -2.5, 0.0]]
+
+    # New rows append in the current layout and read back alongside the old one
+    store.upsert(rows([8])[0])
+    df = store.read_all()
+    assert df["seed"].tolist() == [7, 8]
+    assert not df[["camera_target_x", "camera_target_y", "camera_target_z"]].isna().any().any()
+    store.close()
@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+import pytest
+
+from prefetch import RenderPrefetcher
+
+# Stand-in for Blender: starts, takes a seed and never finishes rendering it
+HUNG_BLENDER = """#!{python}
+import sys, time
+print("@@READY", flush=True)
+sys.stdin.readline()
+time.sleep(60)
+"""
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs an executable script as the Blender binary")
+def test_close_does_not_wait_for_renders_in_flight(tmp_path):
+    blender = tmp_path / "blender"
+    blender.write_text(HUNG_BLENDER.format(python=sys.executable))
+    blender.chmod(0o755)
+    prefetcher = RenderPrefetcher(str(blender), "scene.blend", str(tmp_path / "cache"), workers=2)
+    prefetcher.request([1, 2])
+    deadline = time.monotonic() + 10
+    while len(prefetcher.workers) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(prefetcher.workers) == 2
+
+    t0 = time.monotonic()
+    prefetcher.close()
+    assert time.monotonic() - t0 < 5
+    assert not any(t.is_alive() for t in prefetcher.threads)
+    assert not any(w.alive() for w in prefetcher.workers.values())
@@ -0,0 +1,16 @@
+from batch_sampler import sample_params
+from param_store import open_store
+from review_index import ReviewIndex
+
+
+def test_index_of_follows_the_filter(tmp_path):
+    path = str(tmp_path / "data.db")
+    df = sample_params([5, 3, 9, 7]).assign(valid=[True, True, True, False])
+    open_store(path).upsert_many(df.astype(object).where(df.notnull(), None).to_dict("records"))
+
+    index = ReviewIndex(path)
+    assert index.set_filter("all") == 3
+    assert [index.index_of(s) for s in (3, 5, 9, 7)] == [0, 1, 2, None]
+    assert index.set_filter("recent", count=2) == 2
+    assert [index.index_of(s) for s in (9, 3, 5)] == [0, 1, None]
+    assert index.seed(index.index_of(3)) == 3
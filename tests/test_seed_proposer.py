@@ -0,0 +1,20 @@
+import numpy as np
+
+import seed_proposer
+from seed_proposer import EXPLORE_LABEL, propose
+
+
+class Flat:
+    def predict_proba(self, df):
+        return np.full(len(df), 0.5)
+
+
+def test_exploration_passes_the_coverage_filter(monkeypatch):
+    # Stand-in filter that keeps every third seed
+    monkeypatch.setattr(seed_proposer, "coverage_filter",
+                        lambda seeds, *args, **kwargs: ([s for s in seeds if s % 3 == 0], None))
+    proposals = propose(Flat(), range(5000), 100, explore=0.2, min_coverage=0.5, grid_half_extent=(1.0, 1.0))
+    assert len(proposals) == 100
+    assert (proposals["proposer"] == EXPLORE_LABEL).sum() == 20
+    assert (proposals["seed"] % 3 == 0).all()
+    assert proposals["seed"].is_unique
@@ -0,0 +1,194 @@
+import os
+import sys
+sys.path.append(r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar")
+import bpy
+import bpy.utils.previews
+from param_store import open_store
+from label_writer import open_writer, release_writer
+
+# Batch review from pre-rendered thumbnails: pages of PAGE_SIZE stills from a
+# headless render manifest are shown as a grid in the HexGrid sidebar tab.
+# Every thumbnail starts unreviewed; clicking one cycles it through valid,
+# invalid and back. "Commit Page" queues the reviewed ones for the
+# background label writer (label_writer.py) and loads the next page;
+# unreviewed thumbnails stay in the queue.
+# Render the thumbnails first, e.g.
+#   python render_farm.py --blend scene.blend --start 0 --stop 5000 --out thumbs/ --res-percent 25
+
+# === CONFIG ===
+CSV_PATH = r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar\data.csv"
+THUMB_DIR = r"C:\Users\1234\Documents\Obsidian\Blender\Terrain_random_perfeccionar\thumbs"
+MANIFEST = os.path.join(THUMB_DIR, "manifest.csv")
+PAGE_SIZE = 16
+GRID_COLUMNS = 4
+THUMB_SCALE = 6.0
+LABEL_FLUSH_TIMEOUT = 5.0  # seconds Load Thumbnails waits for pending labels
+
+# Manifest columns that describe the render, not the seed
+RENDER_COLUMNS = ("image", "render_time")
+
+queue_rows = []   # manifest rows still to review, in seed order
+page = []         # rows on screen
+decided = {}      # index into page -> valid, for the reviewed thumbnails
+previews = None
+writer = None     # label writer for CSV_PATH, shared with Human_in_the_middle_validation
+
+
+def load_queue():
+    # -> False if pending labels were not stored within LABEL_FLUSH_TIMEOUT
+    global queue_rows, writer
+    if writer is None:
+        writer = open_writer(CSV_PATH)
+    flushed = writer.flush(timeout=LABEL_FLUSH_TIMEOUT)  # labels of earlier pages count as labelled
+    manifest = open_store(MANIFEST).read_all()
+    store = open_store(CSV_PATH)
+    labelled = set(store.seeds()) if store.exists() else set()
+    manifest = manifest[~manifest["seed"].isin(labelled)]
+    manifest = manifest[[os.path.exists(os.path.join(THUMB_DIR, p)) for p in manifest["image"]]]
+    manifest = manifest.astype(object).where(manifest.notnull(), None)
+    queue_rows = manifest.sort_values("seed").to_dict("records")
+    print(f"{len(queue_rows)} thumbnails to review")
+    return flushed
+
+
+def load_page():
+    global page, decided
+    page, decided = queue_rows[:PAGE_SIZE], {}
+    previews.clear()
+    for row in page:
+        previews.load(str(row["seed"]), os.path.join(THUMB_DIR, row["image"]), 'IMAGE')
+
+
+def redraw(context):
+    for area in context.screen.areas:
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+
+
+class HEXGRID_OT_thumbs_start(bpy.types.Operator):
+    bl_idname = "hexgrid.thumbs_start"
+    bl_label = "Load Thumbnails"
+
+    def execute(self, context):
+        if not load_queue():
+            self.report({'WARNING'}, f"{writer.pending()} labels are not stored yet; they stay in "
+                                     f"{os.path.basename(writer.journal_path)} and may come up again")
+        load_page()
+        redraw(context)
+        return {'FINISHED'}
+
+
+class HEXGRID_OT_thumbs_toggle(bpy.types.Operator):
+    bl_idname = "hexgrid.thumbs_toggle"
+    bl_label = "Toggle Label"
+
+    index: bpy.props.IntProperty()
+
+    def execute(self, context):
+        # unreviewed -> valid -> invalid -> unreviewed
+        state = decided.pop(self.index, None)
+        if state is None:
+            decided[self.index] = True
+        elif state:
+            decided[self.index] = False
+        redraw(context)
+        return {'FINISHED'}
+
+
+class HEXGRID_OT_thumbs_commit(bpy.types.Operator):
+    bl_idname = "hexgrid.thumbs_commit"
+    bl_label = "Commit Page"
+
+    def execute(self, context):
+        global queue_rows
+        rows = []
+        for i, row in enumerate(page):
+            if i in decided:
+                row = {k: v for k, v in row.items() if k not in RENDER_COLUMNS}
+                row["valid"] = decided[i]
+                rows.append(row)
+        if rows:
+            writer.put_many(rows)
+            print(f"Queued {len(rows)} labels ({len(rows) - sum(decided.values())} invalid)")
+        # Unreviewed thumbnails come up again on the next page
+        queue_rows = [row for i, row in enumerate(page) if i not in decided] + queue_rows[len(page):]
+        load_page()
+        redraw(context)
+        return {'FINISHED'}
+
+
+class HEXGRID_OT_thumbs_skip(bpy.types.Operator):
+    bl_idname = "hexgrid.thumbs_skip"
+    bl_label = "Skip Page"
+
+    def execute(self, context):
+        global queue_rows
+        # Skipped rows go to the back of the queue
+        queue_rows = queue_rows[len(page):] + page
+        load_page()
+        redraw(context)
+        return {'FINISHED'}
+
+
+class HEXGRID_PT_thumbnails(bpy.types.Panel):
+    bl_label = "HexGrid Thumbnail Review"
+    bl_idname = "HEXGRID_PT_thumbnails"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'HexGrid'
+
+    def draw(self, context):
+        layout = self.layout
+        row = layout.row()
+        row.operator("hexgrid.thumbs_start", text="Load Thumbnails", icon='FILE_REFRESH')
+        row.label(text=f"{len(queue_rows)} left")
+        if not page:
+            return
+
+        grid = layout.grid_flow(row_major=True, columns=GRID_COLUMNS, even_columns=True, even_rows=True)
+        for i, row in enumerate(page):
+            col = grid.column(align=True)
+            col.template_icon(icon_value=previews[str(row["seed"])].icon_id, scale=THUMB_SCALE)
+            state = decided.get(i)
+            op = col.operator("hexgrid.thumbs_toggle", text=str(row["seed"]), depress=state is not None,
+                              icon={None: 'QUESTION', True: 'CHECKMARK', False: 'CANCEL'}[state])
+            op.index = i
+
+        layout.separator()
+        row = layout.row()
+        row.operator("hexgrid.thumbs_commit", text=f"Commit Page ({len(decided)} of {len(page)} reviewed)",
+                     icon='CHECKMARK')
+        row.operator("hexgrid.thumbs_skip", text="Skip Page", icon='FORWARD')
+
+
+classes = [
+    HEXGRID_PT_thumbnails,
+    HEXGRID_OT_thumbs_start,
+    HEXGRID_OT_thumbs_toggle,
+    HEXGRID_OT_thumbs_commit,
+    HEXGRID_OT_thumbs_skip,
+]
+
+def unregister():
+    global previews, writer
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except RuntimeError:
+            pass  # class not registered
+    if previews is not None:
+        bpy.utils.previews.remove(previews)
+        previews = None
+    if writer is not None:
+        release_writer(writer)
+        writer = None
+
+def register():
+    global previews
+    unregister()
+    previews = bpy.utils.previews.new()
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,114 @@
+# Per-stage timers for the seed -> scene -> render path.
+#
+#   with timing.stage("update.modifier"):
+#       ...
+#
+# Off by default (or set HEXGRID_TIMING=1); while off, stage() hands back a
+# shared no-op context manager, so instrumented code costs one global lookup
+# and a call. While on, every stage records its duration; summary() gives
+# per-stage percentiles over everything recorded since the last reset(), and
+# the raw events can be written as JSON or as a Chrome trace
+# (chrome://tracing, ui.perfetto.dev).
+import contextlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+ENABLED = os.environ.get("HEXGRID_TIMING", "") == "1"
+
+_events = []  # (stage, start_ns, duration_ns, thread id)
+_lock = threading.Lock()
+_t0 = time.perf_counter_ns()
+_NULL = contextlib.nullcontext()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _events.clear()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        with _lock:
+            _events.append((self.name, self.start, end - self.start, threading.get_ident()))
+        return False
+
+
+def stage(name):
+    return _Stage(name) if ENABLED else _NULL
+
+
+def record(name, seconds):
+    # A duration measured elsewhere (e.g. across timer callbacks)
+    if ENABLED:
+        end = time.perf_counter_ns()
+        with _lock:
+            _events.append((name, end - int(seconds * 1e9), int(seconds * 1e9), threading.get_ident()))
+
+
+def summary():
+    # {stage: {"count", "total", "mean", "p50", "p90", "p99", "max"}}, seconds
+    with _lock:
+        events = list(_events)
+    by_stage = {}
+    for name, _, duration, _ in events:
+        by_stage.setdefault(name, []).append(duration)
+    out = {}
+    for name, durations in by_stage.items():
+        d = np.array(durations, dtype=np.float64) / 1e9
+        p50, p90, p99 = np.percentile(d, [50, 90, 99])
+        out[name] = {
+            "count": len(d), "total": float(d.sum()), "mean": float(d.mean()),
+            "p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(d.max()),
+        }
+    return out
+
+
+def print_summary():
+    stats = summary()
+    if not stats:
+        return
+    print(f"{'stage':<24} {'count':>6} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for name, s in sorted(stats.items(), key=lambda kv: -kv[1]["total"]):
+        print(f"{name:<24} {s['count']:>6} {s['total']:>9.2f} {s['mean'] * 1e3:>9.2f} "
+              f"{s['p50'] * 1e3:>9.2f} {s['p90'] * 1e3:>9.2f} {s['p99'] * 1e3:>9.2f}")
+
+
+def export_json(path):
+    with _lock:
+        events = [
+            {"stage": name, "start": (start - _t0) / 1e9, "duration": duration / 1e9, "thread": tid}
+            for name, start, duration, tid in _events
+        ]
+    with open(path, "w") as f:
+        json.dump({"summary": summary(), "events": events}, f, indent=1)
+
+
+def export_chrome_trace(path):
+    # Complete ("X") events in microseconds
+    pid = os.getpid()
+    with _lock:
+        trace = [
+            {"name": name, "ph": "X", "ts": (start - _t0) / 1e3, "dur": duration / 1e3, "pid": pid, "tid": tid}
+            for name, start, duration, tid in _events
+        ]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
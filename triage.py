@@ -0,0 +1,77 @@
+# Model-in-the-loop triage: score candidate seeds with the saved validity
+# classifier before anyone renders them, and decide which ones a human sees.
+#
+# Scoring needs only the sampled parameters (batch_sampler), no Blender.
+# Policies for the human queue:
+#   "uncertainty"  closest to the decision threshold first (active learning)
+#   "score"        most likely valid first
+#   "sequential"   plain seed order, only the auto-accept/reject cut applied
+# With min_coverage, seeds whose camera frame is mostly empty (frustum_check,
+# which needs grid_half_extent and optionally clip_end) are rejected before
+# scoring.
+import numpy as np
+import pandas as pd
+
+from batch_sampler import sample_params
+from frustum_check import coverage_filter
+from validity_model import predict
+
+POLICIES = ("uncertainty", "score", "sequential")
+
+# Rows labelled here instead of by a reviewer carry this in label_source
+MODEL_LABEL = "model"
+
+
+def load_classifier(path):
+    # Artifact saved by python -m validity_model.train (or AI_v.0.0.py)
+    return predict.load(path)
+
+
+def score(clf, df):
+    return clf.predict_proba(df)
+
+
+def triage(clf, seeds, policy="uncertainty", accept_above=None, reject_below=None,
+           exclude=(), limit=None, min_coverage=None, grid_half_extent=None, clip_end=None):
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown triage policy '{policy}', expected one of {POLICIES}")
+
+    exclude = set(exclude)
+    seeds = np.array([s for s in seeds if s not in exclude], dtype=np.int64)
+    df = sample_params(seeds)
+    low_coverage = df.iloc[:0]
+    if min_coverage is not None:
+        keep, low_coverage = coverage_filter(seeds, min_coverage, grid_half_extent, params=df, clip_end=clip_end)
+        df = df[df["seed"].isin(keep)]
+    df["model_score"] = score(clf, df)
+    p = df["model_score"].to_numpy()
+
+    accept = p >= accept_above if accept_above is not None else np.zeros(len(df), bool)
+    reject = p < reject_below if reject_below is not None else np.zeros(len(df), bool)
+    reject &= ~accept
+    review = df[~(accept | reject)]
+
+    if policy == "uncertainty":
+        order = np.argsort(np.abs(review["model_score"].to_numpy() - clf.threshold), kind="stable")
+    elif policy == "score":
+        order = np.argsort(-review["model_score"].to_numpy(), kind="stable")
+    else:
+        order = np.arange(len(review))
+    review = review.iloc[order]
+    if limit is not None:
+        review = review.iloc[:limit]
+
+    accepted = df[accept].assign(valid=True, label_source=MODEL_LABEL)
+    rejected = df[reject].assign(valid=False, label_source=MODEL_LABEL)
+    print(f"Triage ({policy}): {len(review)} queued for review, "
+          f"{len(accepted)} auto-accepted, {len(rejected)} auto-rejected out of {len(df)}")
+    if len(low_coverage):
+        rejected = pd.concat([rejected, low_coverage], ignore_index=True)
+    return review["seed"].tolist(), accepted, rejected
+
+
+def store_auto_labels(store, *frames):
+    for df in frames:
+        if len(df):
+            df = df.astype(object).where(df.notnull(), None)
+            store.upsert_many(df.to_dict("records"))
@@ -0,0 +1,4 @@
+# Validity classifier: feature matrix (features.py), training (train.py,
+# one backend module per model type), single-file model artifacts
+# (artifact.py), lightweight batch scoring (predict.py) and the command
+# line (python -m validity_model).
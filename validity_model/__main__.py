@@ -0,0 +1,3 @@
+from validity_model.cli import main
+
+main()
@@ -0,0 +1,67 @@
+# One file per trained classifier: model, scaler, threshold, feature order
+# and a hash of the training data, so a model can always be traced back to
+# the labels it saw.
+#
+# Only plain Python/NumPy objects are pickled. The scaler is stored as its
+# mean/scale arrays and the model as the backend's own serialized bytes
+# (XGBoost UBJSON, Keras .keras), so loading the artifact imports neither
+# sklearn nor TensorFlow.
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+BACKENDS = ("xgboost", "keras")
+
+
+def data_hash(X, y, features):
+    h = hashlib.sha256()
+    h.update(",".join(features).encode())
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.int8).tobytes())
+    return h.hexdigest()
+
+
+def model_bytes(model, backend):
+    if backend == "xgboost":
+        return bytes(model.get_booster().save_raw("ubj"))
+    if backend == "keras":
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.keras")
+            model.save(path)
+            with open(path, "rb") as f:
+                return f.read()
+    raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+
+def save_artifact(path, backend, model, scaler, threshold, features, data_hash, **info):
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "backend": backend,
+        "model": model_bytes(model, backend),
+        "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "threshold": float(threshold),
+        "features": list(features),
+        "data_hash": data_hash,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **info,
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    print(f"Saved {backend} artifact to {path} (data {data_hash[:12]})")
+    return artifact
+
+
+def load_artifact(path):
+    with open(path, "rb") as f:
+        artifact = pickle.load(f)
+    if not isinstance(artifact, dict) or artifact.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"{path} is not a version {ARTIFACT_VERSION} validity model artifact")
+    return artifact
@@ -0,0 +1,80 @@
+# python -m validity_model train    [--backend xgboost|keras] [--no-plots] ...
+# python -m validity_model evaluate --model validity_model.pkl [--no-plots] ...
+# python -m validity_model update   --model validity_model.pkl [--force-refit] ...
+# python -m validity_model search   [--folds 5] [--configs 40] [--workers N] [--out ...]
+#
+# Nothing heavy is imported at module level: train pulls in sklearn plus the
+# selected backend, evaluate only the artifact's backend, and matplotlib is
+# imported only when plots are on.
+import argparse
+
+from validity_model.artifact import BACKENDS
+
+
+def evaluate(model_path, data_path, plots=True, plot_dir="."):
+    from validity_model import predict
+    from validity_model.features import load_data
+    from validity_model.train import report
+
+    model = predict.load(model_path)
+    X, y, _, _ = load_data(data_path, model.features)
+    proba = model.predict_proba(X)
+    print(f"{model.backend} model, threshold {model.threshold:.2f}, trained on data {model.data_hash[:12]}")
+    report(y, proba, model.threshold)
+
+    if plots:
+        from validity_model import plots as plotting
+        plotting.plot_all(y, proba, {}, model.features, plot_dir)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m validity_model")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train", help="train a classifier and save an artifact")
+    p.add_argument("--data", default="data.csv")
+    p.add_argument("--backend", choices=BACKENDS, default="xgboost")
+    p.add_argument("--out", default="validity_model.pkl")
+    p.add_argument("--test-size", type=float, default=0.2)
+
+    p = sub.add_parser("evaluate", help="score a saved artifact against labelled data")
+    p.add_argument("--model", default="validity_model.pkl")
+    p.add_argument("--data", default="data.csv")
+
+    p = sub.add_parser("update", help="continue training an artifact on rows labelled since it was saved")
+    p.add_argument("--model", default="validity_model.pkl")
+    p.add_argument("--data", default="data.csv")
+    p.add_argument("--out", default=None, help="defaults to overwriting --model")
+    p.add_argument("--rounds", type=int, default=20, help="extra boosting rounds (xgboost)")
+    p.add_argument("--epochs", type=int, default=5, help="warm-start epochs (keras)")
+    p.add_argument("--force-refit", action="store_true")
+
+    p = sub.add_parser("search", help="cross-validated XGBoost hyperparameter and threshold search")
+    p.add_argument("--data", default="data.csv")
+    p.add_argument("--folds", type=int, default=5)
+    p.add_argument("--configs", type=int, default=None, help="random subset of the grid (default: all)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--cache-dir", default=".search_cache")
+    p.add_argument("--prune-margin", type=float, default=0.02, help="drop configs this far below the best fold-0 AUC")
+    p.add_argument("--out", default=None, help="refit the best config on all rows and save an artifact here")
+
+    # search and update never draw figures
+    for p in (sub.choices["train"], sub.choices["evaluate"]):
+        p.add_argument("--no-plots", action="store_true", help="skip figures (never imports matplotlib)")
+        p.add_argument("--plot-dir", default=".")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "train":
+        from validity_model.train import train
+        train(args.data, args.backend, args.out, args.test_size, not args.no_plots, args.plot_dir)
+    elif args.command == "evaluate":
+        evaluate(args.model, args.data, not args.no_plots, args.plot_dir)
+    elif args.command == "search":
+        from validity_model.search import search
+        search(args.data, args.folds, args.configs, args.workers, args.cache_dir, args.prune_margin, args.out)
+    elif args.command == "update":
+        from validity_model.incremental import update
+        update(args.model, args.data, args.out, args.rounds, args.epochs, args.force_refit)
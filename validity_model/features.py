@@ -0,0 +1,100 @@
+# Feature matrix for the validity classifier, shared by train, search,
+# incremental and evaluate.
+#
+# The schema is explicit: RAW_FEATURES are read from the parameter store as
+# float32 (camera_dist, camera_target_* and the other bookkeeping columns
+# are never read) and DERIVED features are computed from them. The result
+# is one contiguous float32 matrix.
+#
+# load_data caches that matrix next to the data file as .npy files and
+# memory-maps them on later runs. The cache is rebuilt when the store
+# changes or the schema version is bumped.
+import json
+import os
+
+import numpy as np
+
+from param_store import N_COLORS, open_store
+
+SCHEMA_VERSION = 1
+
+RAW_FEATURES = [
+    "scale",
+    "detail",
+    "roughness",
+    "lacunarity",
+    "distortion",
+    "instance_scale",
+    "light_altitude",
+    "light_azimuth",
+    "camera_azimuth",
+    "camera_polar",
+    "camera_scale",
+]
+RAW_FEATURES += [f"color_{i}_{c}" for i in range(N_COLORS) for c in "rgb"]
+RAW_FEATURES += ["offset_x", "offset_y", "offset_z"]
+
+# name -> function of the raw columns
+DERIVED = {
+    "camera_elevation": lambda c: np.pi / 2 - c["camera_polar"],
+    "camera_azimuth_sin": lambda c: np.sin(c["camera_azimuth"]),
+    "camera_azimuth_cos": lambda c: np.cos(c["camera_azimuth"]),
+    "light_azimuth_sin": lambda c: np.sin(c["light_azimuth"]),
+    "light_azimuth_cos": lambda c: np.cos(c["light_azimuth"]),
+}
+
+FEATURES = RAW_FEATURES + list(DERIVED)
+
+
+def feature_matrix(df, features=FEATURES):
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for j, name in enumerate(features):
+        if name in DERIVED:
+            X[:, j] = DERIVED[name](df)
+        else:
+            X[:, j] = df[name]
+    return X
+
+
+def _cache_paths(data_path):
+    base = os.path.abspath(data_path) + ".features"
+    return {k: os.path.join(base, f"{k}.npy") for k in ("X", "y", "seeds")}, os.path.join(base, "meta.json")
+
+
+def _build(store):
+    columns = RAW_FEATURES + ["seed", "valid", "label_source"]
+    df = store.read_all(columns=columns)
+    df = df[df["valid"].notnull()]
+    if "label_source" in df.columns:
+        df = df[df["label_source"].isnull()]  # only human labels, not triage auto-labels
+    X = feature_matrix(df[RAW_FEATURES].astype(np.float32))
+    y = df["valid"].astype(np.int8).to_numpy()
+    seeds = df["seed"].to_numpy(dtype=np.int64)
+    return X, y, seeds
+
+
+def load_data(path, features=None, cache=True):
+    # -> X (float32, n x len(features)), y (int8), seeds (int64), feature names
+    store = open_store(path)
+    files, meta_path = _cache_paths(path)
+    meta = {"schema": SCHEMA_VERSION, "features": FEATURES, "stamp": [list(s) for s in store.stamp()]}
+
+    hit = False
+    if cache and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            hit = json.load(f) == meta and all(os.path.exists(p) for p in files.values())
+
+    if hit:
+        X, y, seeds = (np.load(files[k], mmap_mode="r") for k in ("X", "y", "seeds"))
+    else:
+        X, y, seeds = _build(store)
+        if cache:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            for k, arr in zip(("X", "y", "seeds"), (X, y, seeds)):
+                np.save(files[k], arr)
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+    if features is not None and list(features) != FEATURES:
+        X = X[:, [FEATURES.index(name) for name in features]]
+    return X, y, seeds, list(features or FEATURES)
@@ -0,0 +1,109 @@
+# Incremental retraining: keep a saved artifact current as labels arrive.
+#
+#   python -m validity_model update --model validity_model.pkl --data data.csv
+#
+# Only rows whose seed the artifact has not seen yet are used. A trained seed
+# whose label has changed since forces a full refit, as more rounds or epochs
+# on top cannot unlearn the old label. XGBoost models
+# get extra boosting rounds on top of the saved booster; Keras models get a
+# few warm-started epochs. The scaler and threshold are kept as they are.
+#
+# Before updating, a cheap drift check compares the new rows against what the
+# model was trained on. If it fires, or the artifact predates incremental
+# support, a full refit runs instead.
+from types import SimpleNamespace
+
+import numpy as np
+
+from validity_model.artifact import data_hash, load_artifact, save_artifact
+from validity_model.features import load_data
+from validity_model.predict import Predictor
+
+# Drift thresholds
+MEAN_SHIFT_Z = 4.0        # |mean of standardized feature| * sqrt(n)
+POS_RATE_Z = 4.0          # label-rate change in binomial standard errors
+LOGLOSS_RATIO = 1.5       # logloss on new rows vs. the held-out logloss at training time
+MAX_NEW_FRACTION = 0.5    # refit once the increment is this large relative to the training set
+
+
+def check_drift(artifact, X_new, y_new):
+    # Returns the reason a full refit is needed, or None
+    n = len(X_new)
+    n_trained = len(artifact["trained_seeds"])
+    if n > MAX_NEW_FRACTION * n_trained:
+        return f"{n} new rows vs {n_trained} trained"
+
+    Z = (np.asarray(X_new, dtype=np.float64) - artifact["scaler_mean"]) / artifact["scaler_scale"]
+    shift = np.abs(Z.mean(axis=0)) * np.sqrt(n)
+    worst = int(np.argmax(shift))
+    if shift[worst] > MEAN_SHIFT_Z:
+        return f"feature '{artifact['features'][worst]}' shifted (z={shift[worst]:.1f})"
+
+    p0 = artifact["pos_rate"]
+    se = np.sqrt(max(p0 * (1 - p0), 1e-6) / n)
+    if abs(y_new.mean() - p0) / se > POS_RATE_Z:
+        return f"valid rate {y_new.mean():.2f} vs {p0:.2f} at training time"
+
+    proba = np.clip(Predictor(artifact).predict_proba(X_new), 1e-7, 1 - 1e-7)
+    logloss = -np.mean(y_new * np.log(proba) + (1 - y_new) * np.log(1 - proba))
+    if logloss > LOGLOSS_RATIO * artifact["val_logloss"]:
+        return f"logloss on new rows {logloss:.3f} vs {artifact['val_logloss']:.3f}"
+    return None
+
+
+def match_trained(artifact, seeds, y):
+    # -> mask of seeds the artifact was trained on, number of those relabelled since
+    order = np.argsort(artifact["trained_seeds"])
+    trained = artifact["trained_seeds"][order]
+    labels = artifact["trained_labels"][order]
+    pos = np.minimum(np.searchsorted(trained, seeds), len(trained) - 1)
+    seen = trained[pos] == seeds
+    return seen, int(np.count_nonzero(labels[pos[seen]] != y[seen]))
+
+
+def update(model_path, data_path, out=None, rounds=20, epochs=5, force_refit=False):
+    from validity_model.train import get_backend, train
+
+    out = out or model_path
+    artifact = load_artifact(model_path)
+    backend = artifact["backend"]
+    if force_refit or "trained_labels" not in artifact:
+        print("Full refit requested" if force_refit else "Artifact has no training checkpoint, full refit")
+        return train(data_path, backend, out, plots=False)
+
+    X, y, seeds, _ = load_data(data_path, artifact["features"])
+    seen, relabelled = match_trained(artifact, seeds, y)
+    if relabelled:
+        print(f"{relabelled} trained seeds were relabelled, full refit")
+        return train(data_path, backend, out, plots=False)
+    new = ~seen
+    if not new.any():
+        print("No new labelled rows since the last checkpoint")
+        return artifact
+    X_new, y_new = X[new], y[new]
+
+    reason = check_drift(artifact, X_new, y_new)
+    if reason is not None:
+        print(f"Drift detected ({reason}), full refit")
+        return train(data_path, backend, out, plots=False)
+
+    scaler = SimpleNamespace(mean_=artifact["scaler_mean"], scale_=artifact["scaler_scale"])
+    X_scaled = (np.asarray(X_new, dtype=np.float64) - scaler.mean_) / scaler.scale_
+    trainer = get_backend(backend)
+    if backend == "xgboost":
+        model = trainer.update(artifact["model"], X_scaled, y_new, rounds=rounds)
+    else:
+        model = trainer.update(artifact["model"], X_scaled, y_new, epochs=epochs)
+
+    print(f"Updated {backend} model with {int(new.sum())} new rows")
+    keep = {k: artifact[k] for k in ("roc_auc", "pos_rate", "val_logloss") if k in artifact}
+    return save_artifact(
+        out, backend, model, scaler, artifact["threshold"], artifact["features"],
+        data_hash(X, y, artifact["features"]),
+        n_rows=len(X),
+        trained_seeds=np.concatenate([artifact["trained_seeds"], seeds[new]]).astype(np.int64),
+        trained_labels=np.concatenate([artifact["trained_labels"], y[new]]).astype(np.int8),
+        parent=artifact["data_hash"],
+        updates=artifact.get("updates", 0) + 1,
+        **keep,
+    )
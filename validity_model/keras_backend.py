@@ -0,0 +1,56 @@
+# Class-weighted MLP, as in AI_v.1.0.py. Imported only when the keras
+# backend is selected, so nothing else pays for importing TensorFlow.
+import os
+import tempfile
+
+import numpy as np
+from sklearn.utils.class_weight import compute_class_weight
+from tensorflow.keras.layers import Dense, Dropout
+from tensorflow.keras.models import Sequential, load_model
+from tensorflow.keras.optimizers import Adam
+
+
+def build_model(n_features):
+    model = Sequential([
+        Dense(64, activation="relu", input_shape=(n_features,)),
+        Dropout(0.2),
+        Dense(32, activation="relu"),
+        Dropout(0.2),
+        Dense(1, activation="sigmoid")  # Output probability for binary classification
+    ])
+    model.compile(optimizer=Adam(learning_rate=0.001), loss="binary_crossentropy", metrics=["accuracy"])
+    return model
+
+
+def class_weights(y):
+    classes = np.unique(y)
+    weights = compute_class_weight(class_weight="balanced", classes=classes, y=y)
+    return dict(zip(classes.tolist(), weights))
+
+
+def train(X_train, y_train, epochs=50):
+    model = build_model(X_train.shape[1])
+    history = model.fit(
+        X_train, y_train,
+        validation_split=0.2,
+        epochs=epochs,
+        batch_size=32,
+        class_weight=class_weights(y_train),
+        verbose=2
+    )
+    return model, {"history": history.history}
+
+
+def update(raw_model, X_new, y_new, epochs=5):
+    # Warm start: saved weights, a few epochs on the new rows only
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.keras")
+        with open(path, "wb") as f:
+            f.write(raw_model)
+        model = load_model(path)
+    model.fit(X_new, y_new, epochs=epochs, batch_size=32, class_weight=class_weights(y_new), verbose=2)
+    return model
+
+
+def predict_proba(model, X):
+    return model.predict(X, verbose=0).ravel()
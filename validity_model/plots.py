@@ -0,0 +1,76 @@
+# Training/evaluation figures. This is the only module that imports
+# matplotlib; the CLI imports it only when plots are requested.
+import os
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from sklearn.metrics import average_precision_score, precision_recall_curve, roc_auc_score, roc_curve
+
+
+def roc_plot(y_true, proba, out_dir):
+    fpr, tpr, _ = roc_curve(y_true, proba)
+    roc_auc = roc_auc_score(y_true, proba)
+    plt.figure()
+    plt.plot(fpr, tpr, label=f'ROC curve (AUC = {roc_auc:.2f})', linewidth=2)
+    plt.plot([0, 1], [0, 1], 'k--', linewidth=1)
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title('ROC Curve')
+    plt.legend(loc='lower right')
+    plt.grid(True)
+    plt.savefig(os.path.join(out_dir, "roc_curve.png"))
+    plt.close()
+
+
+def precision_recall_plot(y_true, proba, out_dir):
+    precision, recall, _ = precision_recall_curve(y_true, proba)
+    avg_precision = average_precision_score(y_true, proba)
+    plt.figure()
+    plt.plot(recall, precision, label=f'PR curve (AP = {avg_precision:.2f})', linewidth=2)
+    plt.xlabel('Recall')
+    plt.ylabel('Precision')
+    plt.title('Precision-Recall Curve')
+    plt.legend(loc='upper right')
+    plt.grid(True)
+    plt.savefig(os.path.join(out_dir, "precision_recall.png"))
+    plt.close()
+
+
+def feature_importance_plot(importances, features, out_dir, top=10):
+    indices = np.argsort(importances)[::-1][:top]
+    plt.figure(figsize=(10,6))
+    plt.bar(range(len(indices)), importances[indices], align='center')
+    plt.xticks(range(len(indices)), [features[i] for i in indices], rotation=45)
+    plt.title(f"Top {top} Feature Importances")
+    plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, "feature_importance.png"))
+    plt.close()
+
+
+def history_plot(history, out_dir):
+    plt.figure(figsize=(12,4))
+    plt.subplot(1,2,1)
+    plt.plot(history['accuracy'], label='train_acc')
+    plt.plot(history['val_accuracy'], label='val_acc')
+    plt.title('Accuracy')
+    plt.legend()
+
+    plt.subplot(1,2,2)
+    plt.plot(history['loss'], label='train_loss')
+    plt.plot(history['val_loss'], label='val_loss')
+    plt.title('Loss')
+    plt.legend()
+    plt.savefig(os.path.join(out_dir, "training_history.png"))
+    plt.close()
+
+
+def plot_all(y_true, proba, extras, features, out_dir="."):
+    os.makedirs(out_dir, exist_ok=True)
+    roc_plot(y_true, proba, out_dir)
+    precision_recall_plot(y_true, proba, out_dir)
+    if "feature_importances" in extras:
+        feature_importance_plot(extras["feature_importances"], features, out_dir)
+    if "history" in extras:
+        history_plot(extras["history"], out_dir)
@@ -0,0 +1,79 @@
+# Batch scoring with a saved artifact. Imports only NumPy plus the one
+# backend the artifact was trained with; TensorFlow is imported only for
+# Keras artifacts.
+#
+#   from validity_model import predict
+#   model = predict.load("validity_model.pkl")
+#   p = model.predict_proba(df)          # DataFrame with the feature columns
+import os
+import tempfile
+
+import numpy as np
+
+from validity_model.artifact import load_artifact
+from validity_model.features import feature_matrix
+
+BATCH_SIZE = 1 << 18
+
+
+class Predictor:
+    def __init__(self, artifact):
+        self.backend = artifact["backend"]
+        self.features = artifact["features"]
+        self.threshold = artifact["threshold"]
+        self.data_hash = artifact["data_hash"]
+        self.mean = artifact["scaler_mean"].astype(np.float32)
+        self.inv_scale = (1.0 / artifact["scaler_scale"]).astype(np.float32)
+        self.model = self._load_model(artifact["model"])
+
+    def _load_model(self, raw):
+        if self.backend == "xgboost":
+            import xgboost as xgb
+
+            booster = xgb.Booster()
+            booster.load_model(bytearray(raw))
+            return booster
+        if self.backend == "keras":
+            from tensorflow import keras
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "model.keras")
+                with open(path, "wb") as f:
+                    f.write(raw)
+                return keras.models.load_model(path)
+        raise ValueError(f"Unknown backend '{self.backend}'")
+
+    def transform(self, data):
+        if hasattr(data, "columns"):
+            X = feature_matrix(data, self.features)
+        else:
+            X = np.asarray(data, dtype=np.float32)
+        return (X - self.mean) * self.inv_scale
+
+    def _predict(self, X):
+        if self.backend == "xgboost":
+            return self.model.inplace_predict(X)
+        return self.model.predict(X, batch_size=8192, verbose=0).ravel()
+
+    def predict_proba(self, data, batch_size=BATCH_SIZE):
+        n = len(data)
+        out = np.empty(n, dtype=np.float32)
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            out[start:stop] = self._predict(self.transform(data[start:stop]))
+        return out
+
+    def predict(self, data, batch_size=BATCH_SIZE):
+        return self.predict_proba(data, batch_size) >= self.threshold
+
+
+_loaded = {}
+
+
+def load(path):
+    # Loaded once per process; reloaded if the file is replaced
+    path = os.path.abspath(path)
+    stamp = os.stat(path).st_mtime_ns
+    if path not in _loaded or _loaded[path][0] != stamp:
+        _loaded[path] = (stamp, Predictor(load_artifact(path)))
+    return _loaded[path][1]
@@ -0,0 +1,187 @@
+# Hyperparameter search for the XGBoost pipeline with stratified k-fold CV.
+#
+#   python -m validity_model search --data data.csv --folds 5 --configs 40 --out validity_model.pkl
+#
+# Every (config, fold) fit scales and SMOTE-resamples inside its own training
+# fold and early-stops on the validation fold. Fits run in a process pool.
+# Fold 0 of every config runs first; configs whose fold-0 AUC trails the
+# best by more than --prune-margin are dropped before the remaining folds.
+# Each fold result is cached on disk by (data, config, fold), so a rerun only
+# fits what is missing.
+#
+# The threshold is the F1 optimum over the pooled out-of-fold predictions of
+# the best config, so no test data is used to choose it. With --out the best
+# config is refit on all rows and saved as an artifact with that threshold.
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import log_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from validity_model.artifact import data_hash, save_artifact
+from validity_model.features import load_data
+from validity_model.train import f1_threshold
+
+GRID = {
+    "max_depth": [3, 4, 6, 8],
+    "learning_rate": [0.03, 0.1, 0.3],
+    "subsample": [0.7, 1.0],
+    "colsample_bytree": [0.7, 1.0],
+    "min_child_weight": [1, 5],
+}
+MAX_ROUNDS = 1000
+EARLY_STOPPING = 30
+
+_X = _y = None
+
+
+def _init(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _fit_fold(config, train_idx, val_idx):
+    from imblearn.over_sampling import SMOTE
+    from xgboost import XGBClassifier
+
+    scaler = StandardScaler().fit(_X[train_idx])
+    X_train, X_val = scaler.transform(_X[train_idx]), scaler.transform(_X[val_idx])
+    X_res, y_res = SMOTE(random_state=42).fit_resample(X_train, _y[train_idx])
+
+    clf = XGBClassifier(
+        n_estimators=MAX_ROUNDS,
+        early_stopping_rounds=EARLY_STOPPING,
+        eval_metric="logloss",
+        random_state=42,
+        n_jobs=1,
+        **config
+    )
+    clf.fit(X_res, y_res, eval_set=[(X_val, _y[val_idx])], verbose=False)
+    proba = clf.predict_proba(X_val)[:, 1]
+    return {
+        "proba": proba,
+        "auc": roc_auc_score(_y[val_idx], proba),
+        "logloss": log_loss(_y[val_idx], proba, labels=[0, 1]),
+        "best_iteration": int(clf.best_iteration),
+    }
+
+
+def config_grid(n_configs=None, seed=0):
+    configs = [dict(zip(GRID, values)) for values in itertools.product(*GRID.values())]
+    if n_configs is not None and n_configs < len(configs):
+        rng = np.random.default_rng(seed)
+        configs = [configs[i] for i in sorted(rng.choice(len(configs), n_configs, replace=False))]
+    return configs
+
+
+class FoldCache:
+    def __init__(self, cache_dir, data_key, n_folds):
+        self.dir = cache_dir
+        self.prefix = f"{data_key}|{n_folds}"
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, config, fold):
+        key = f"{self.prefix}|{json.dumps(config, sort_keys=True)}|{fold}"
+        return os.path.join(self.dir, hashlib.sha1(key.encode()).hexdigest() + ".npz")
+
+    def get(self, config, fold):
+        path = self._path(config, fold)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as f:
+            return {k: f[k].item() if f[k].ndim == 0 else f[k] for k in f.files}
+
+    def put(self, config, fold, result):
+        path = self._path(config, fold)
+        np.savez(path + ".tmp.npz", **result)
+        os.replace(path + ".tmp.npz", path)
+
+
+def run_folds(pool, cache, configs, config_ids, folds, splits):
+    results = {}
+    todo = []
+    for c, fold in itertools.product(config_ids, folds):
+        cached = cache.get(configs[c], fold)
+        if cached is not None:
+            results[c, fold] = cached
+        else:
+            train_idx, val_idx = splits[fold]
+            todo.append(((c, fold), pool.submit(_fit_fold, configs[c], train_idx, val_idx)))
+    for key, future in todo:
+        results[key] = future.result()
+        cache.put(configs[key[0]], key[1], results[key])
+    return results
+
+
+def search(data_path, n_folds=5, n_configs=None, workers=None, cache_dir=".search_cache",
+           prune_margin=0.02, out=None):
+    X, y, seeds, features = load_data(data_path)
+    X = np.asarray(X, dtype=np.float64)
+    key = data_hash(X, y, features)
+
+    splits = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42).split(X, y))
+    configs = config_grid(n_configs)
+    cache = FoldCache(cache_dir, key, n_folds)
+    print(f"{len(configs)} configs x {n_folds} folds on {len(y)} rows")
+
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init, initargs=(X, y)) as pool:
+        results = run_folds(pool, cache, configs, range(len(configs)), [0], splits)
+        first = np.array([results[c, 0]["auc"] for c in range(len(configs))])
+        alive = [c for c in range(len(configs)) if first[c] >= first.max() - prune_margin]
+        print(f"Pruned {len(configs) - len(alive)} configs after fold 0")
+        results.update(run_folds(pool, cache, configs, alive, range(1, n_folds), splits))
+
+    summary = []
+    for c in alive:
+        folds = [results[c, f] for f in range(n_folds)]
+        aucs = [r["auc"] for r in folds]
+        summary.append({
+            "config": configs[c],
+            "auc_mean": float(np.mean(aucs)),
+            "auc_std": float(np.std(aucs)),
+            "logloss_mean": float(np.mean([r["logloss"] for r in folds])),
+            "best_iteration": int(np.mean([r["best_iteration"] for r in folds])) + 1,
+            "folds": folds,
+        })
+    summary.sort(key=lambda s: -s["auc_mean"])
+
+    best = summary[0]
+    oof = np.empty(len(y))
+    for fold, r in enumerate(best["folds"]):
+        oof[splits[fold][1]] = r["proba"]
+    threshold = f1_threshold(y, oof)
+
+    print(f"\n{'auc':>7} {'+-':>6} {'logloss':>8} {'trees':>6}  config")
+    for s in summary[:10]:
+        print(f"{s['auc_mean']:7.4f} {s['auc_std']:6.4f} {s['logloss_mean']:8.4f} {s['best_iteration']:6d}  {s['config']}")
+    print(f"\nBest config: {best['config']}")
+    print(f"Out-of-fold ROC-AUC: {roc_auc_score(y, oof):.4f}, F1-optimal threshold: {threshold:.3f}")
+
+    if out:
+        refit(X, y, seeds, features, best, threshold, key, out)
+    return best, threshold, summary
+
+
+def refit(X, y, seeds, features, best, threshold, key, out):
+    from imblearn.over_sampling import SMOTE
+    from xgboost import XGBClassifier
+
+    scaler = StandardScaler().fit(X)
+    X_res, y_res = SMOTE(random_state=42).fit_resample(scaler.transform(X), y)
+    clf = XGBClassifier(n_estimators=best["best_iteration"], eval_metric="logloss", random_state=42,
+                        **best["config"])
+    clf.fit(X_res, y_res)
+    return save_artifact(
+        out, "xgboost", clf, scaler, threshold, features, key,
+        n_rows=len(y), cv_auc=best["auc_mean"], config=best["config"],
+        trained_seeds=np.asarray(seeds, dtype=np.int64),
+        trained_labels=np.asarray(y, dtype=np.int8),
+        pos_rate=float(y.mean()),
+        val_logloss=best["logloss_mean"],
+        updates=0,
+    )
@@ -0,0 +1,91 @@
+# Train the validity classifier and save it as a single artifact.
+#
+#   python -m validity_model train --data data.csv --backend xgboost --out validity_model.pkl
+#
+# xgboost: SMOTE-balanced XGBClassifier as in AI_v.0.0.py
+# keras:   class-weighted MLP as in AI_v.1.0.py
+# Both pick the F1-optimal probability threshold on the held-out split.
+# The backend module and plots are imported only when used.
+import importlib
+import sys
+
+import numpy as np
+from sklearn.metrics import classification_report, confusion_matrix, log_loss, precision_recall_curve, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from validity_model.artifact import BACKENDS, data_hash, save_artifact
+from validity_model.features import load_data
+
+BACKEND_MODULES = {
+    "xgboost": "validity_model.xgb_backend",
+    "keras": "validity_model.keras_backend",
+}
+
+
+def get_backend(name):
+    if name not in BACKEND_MODULES:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    return importlib.import_module(BACKEND_MODULES[name])
+
+
+def f1_threshold(y_true, proba):
+    precision, recall, thresholds = precision_recall_curve(y_true, proba)
+    f1_scores = 2 * (precision * recall) / (precision + recall + 1e-8)
+    return thresholds[np.argmax(f1_scores[:-1])]
+
+
+def report(y_true, proba, threshold):
+    y_pred = (proba >= threshold).astype(int)
+    print("\nClassification Report:\n", classification_report(y_true, y_pred))
+    print("Confusion Matrix:\n", confusion_matrix(y_true, y_pred))
+    roc_auc = roc_auc_score(y_true, proba)
+    print(f"ROC-AUC: {roc_auc:.4f}")
+    return roc_auc
+
+
+def train(data_path, backend="xgboost", out="validity_model.pkl", test_size=0.2,
+          plots=True, plot_dir="."):
+    X, y, seeds, features = load_data(data_path)
+    print("Class distribution (invalid, valid):", np.bincount(y, minlength=2))
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=42, stratify=y
+    )
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+
+    trainer = get_backend(backend)
+    model, extras = trainer.train(X_train, y_train)
+    y_proba = trainer.predict_proba(model, X_test)
+    threshold = f1_threshold(y_test, y_proba)
+    print(f"\nOptimal probability threshold (F1-maximized): {threshold:.2f}")
+    roc_auc = report(y_test, y_proba, threshold)
+
+    if "feature_importances" in extras:
+        importances = extras["feature_importances"]
+        print("\nTop 10 features:")
+        for i in np.argsort(importances)[::-1][:10]:
+            print(f"{features[i]}: {importances[i]:.3f}")
+
+    if plots:
+        from validity_model import plots as plotting
+        plotting.plot_all(y_test, y_proba, extras, features, plot_dir)
+
+    return save_artifact(
+        out, backend, model, scaler, threshold, features,
+        data_hash(X, y, features),
+        n_rows=len(X), roc_auc=float(roc_auc),
+        # baseline for validity_model.incremental
+        trained_seeds=np.asarray(seeds, dtype=np.int64),
+        trained_labels=np.asarray(y, dtype=np.int8),
+        pos_rate=float(y.mean()),
+        val_logloss=float(log_loss(y_test, np.clip(y_proba, 1e-7, 1 - 1e-7), labels=[0, 1])),
+        updates=0,
+    )
+
+
+if __name__ == "__main__":
+    from validity_model.cli import main
+    main(["train"] + sys.argv[1:])
@@ -0,0 +1,40 @@
+# SMOTE-balanced XGBoost, as in AI_v.0.0.py. Imported only when the
+# xgboost backend is selected.
+import xgboost as xgb
+from imblearn.over_sampling import SMOTE
+from sklearn.utils.class_weight import compute_sample_weight
+from xgboost import XGBClassifier
+
+PARAMS = dict(
+    max_depth=4,
+    learning_rate=0.1,
+    eval_metric="logloss",
+    random_state=42
+)
+
+
+def train(X_train, y_train, n_estimators=200):
+    X_res, y_res = SMOTE(random_state=42).fit_resample(X_train, y_train)
+    clf = XGBClassifier(n_estimators=n_estimators, **PARAMS)
+    clf.fit(X_res, y_res)
+    return clf, {"feature_importances": clf.feature_importances_}
+
+
+def update(raw_model, X_new, y_new, rounds=20):
+    # Continued boosting: `rounds` more trees fitted on the new rows only,
+    # class-balanced by sample weight since SMOTE needs more rows than a
+    # typical increment has. Goes through xgb.train because
+    # XGBClassifier.fit rejects an increment that holds only one class.
+    booster = xgb.Booster()
+    booster.load_model(bytearray(raw_model))
+    dtrain = xgb.DMatrix(X_new, label=y_new, weight=compute_sample_weight("balanced", y_new))
+    params = dict(objective="binary:logistic", max_depth=PARAMS["max_depth"], eta=PARAMS["learning_rate"],
+                  eval_metric=PARAMS["eval_metric"], seed=PARAMS["random_state"])
+    booster = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=booster)
+    clf = XGBClassifier()
+    clf.load_model(bytearray(booster.save_raw("ubj")))
+    return clf
+
+
+def predict_proba(model, X):
+    return model.predict_proba(X)[:, 1]